@@ -0,0 +1,49 @@
+import gc
+import timeit
+import tracemalloc
+
+from core import actor, actor_role, scene
+
+API_ACTOR = actor.APIActor
+JSON_ROLE = actor_role.JsonFieldRole
+MODEL_ROLE = actor_role.ModelFieldRole
+
+ACTORS = 10000
+NUMBER = 200
+
+
+def build_actors(count: int) -> dict[str, actor.APIActor]:
+    actors = {}
+    for i in range(count):
+        if i % 2:
+            actors[f"field{i}"] = API_ACTOR(f"field{i}", str, JSON_ROLE, MODEL_ROLE, JSON_ROLE)
+        else:
+            actors[f"field{i}"] = API_ACTOR(
+                f"field{i}", int, JSON_ROLE, MODEL_ROLE, JSON_ROLE, model_name=f"column{i}"
+            )
+    return actors
+
+
+def measure_footprint(count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    actors = build_actors(count)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del actors
+    return (after - before) / count
+
+
+if __name__ == "__main__":
+    print(f"per-actor footprint: {measure_footprint(ACTORS):8.1f} bytes ({ACTORS} actors, 3 roles each)")
+
+    actors = build_actors(20)
+    row = {f"column{i}" if i % 2 == 0 else f"field{i}": i for i in range(20)}
+    detail = scene.DetailScene(scene.Cast(set(actors)))
+    elapsed = timeit.timeit(lambda: detail(actors, row, {}, {}), number=NUMBER * 10)
+    print(f"detail projection (20 actors): {elapsed / (NUMBER * 10) * 1e6:8.1f} us/row")
+
+    renamed = actors["field0"].get_role("request")
+    elapsed = timeit.timeit(lambda: renamed.translate(1), number=NUMBER * 1000)
+    print(f"renamed role translate: {elapsed / (NUMBER * 1000) * 1e9:8.1f} ns/call")
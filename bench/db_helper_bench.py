@@ -0,0 +1,42 @@
+import timeit
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from core.db.base_class import Base
+from core.helper.db_helper import DBHelper
+from sample.models.sample import User
+
+ROWS = 1000
+NUMBER = 2000
+
+engine = create_engine("sqlite://")
+Base.metadata.create_all(engine)
+helper = DBHelper(User)
+
+
+def legacy_find_and_count(db: Session, offset: int, limit: int):
+    query = db.query(User)
+    return query.offset(offset).limit(limit).all(), query.count()
+
+
+def legacy_get(db: Session, entity_id):
+    return db.query(User).get(entity_id)
+
+
+def run(name, func):
+    elapsed = timeit.timeit(func, number=NUMBER)
+    print(f"{name:<28} {elapsed / NUMBER * 1e6:8.1f} us/call")
+
+
+if __name__ == "__main__":
+    with Session(engine) as db:
+        db.add_all([User(name=f"user{i}", age=i % 90) for i in range(ROWS)])
+        db.commit()
+
+        run("legacy find_and_count", lambda: legacy_find_and_count(db, 20, 20))
+        run("DBHelper.find_and_count", lambda: helper.find_and_count(db, offset=20, limit=20))
+
+        db.expunge_all()
+        run("legacy get (cold)", lambda: (legacy_get(db, 7), db.expunge_all()))
+        run("DBHelper.get (cold)", lambda: (helper.get(db, 7), db.expunge_all()))
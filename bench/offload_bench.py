@@ -0,0 +1,56 @@
+import hashlib
+import os
+import time
+
+from core import actor, actor_role, offload, scenario, scene
+
+API_ACTOR = actor.APIActor
+JSON_ROLE = actor_role.JsonFieldRole
+MODEL_ROLE = actor_role.ModelFieldRole
+
+ROWS = 2000
+ROUNDS = 200
+
+
+def digest(main_roles, sub_roles, data, req, extra):
+    result = {}
+    for role in main_roles:
+        value = str(role.get_value(data)).encode()
+        for _ in range(ROUNDS):
+            value = hashlib.sha256(value).digest()
+        result[role.name] = value.hex()
+    return result
+
+
+class RowScenario(scenario.Scenario):
+    def _extract_data(self, position, data):
+        return data
+
+
+def build_scenario(cpu_bound: bool, pool: offload.ProcessOffload | None) -> RowScenario:
+    actors = {name: API_ACTOR(name, str, JSON_ROLE, MODEL_ROLE, JSON_ROLE) for name in ("name", "address")}
+    scenes = {"digest": scene.BaseScene("models", scene.Cast({"name", "address"}), digest, cpu_bound=cpu_bound)}
+    return RowScenario(scenes, actors, offload=pool)
+
+
+def run(name, _scenario, rows, expected=None):
+    started = time.perf_counter()
+    result = _scenario("digest", rows, {}, {})
+    elapsed = time.perf_counter() - started
+    if expected is not None and result != expected:
+        raise AssertionError(f"{name}: results differ from the in-process run")
+    print(f"{name:<24} {elapsed * 1e3:8.1f} ms ({len(rows) / elapsed:8.0f} rows/s)")
+    return result
+
+
+if __name__ == "__main__":
+    rows = [{"name": f"name{i}", "address": f"{i} Main St"} for i in range(ROWS)]
+    expected = run("in-process", build_scenario(False, None), rows)
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        pool = offload.ProcessOffload(workers, chunk_size=max(1, ROWS // (workers * 4)))
+        _scenario = build_scenario(True, pool)
+        _scenario("digest", rows[:workers], {}, {})
+        run(f"process pool x{workers}", _scenario, rows, expected)
+        pool.shutdown()
+        workers *= 2
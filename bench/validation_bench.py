@@ -0,0 +1,72 @@
+import timeit
+
+from core import actor, actor_role, scene
+
+API_ACTOR = actor.APIActor
+JSON_ROLE = actor_role.JsonFieldRole
+MODEL_ROLE = actor_role.ModelFieldRole
+
+FIELDS = 20
+PAYLOADS = 1000
+
+
+def non_negative(value):
+    if value < 0:
+        return ValueError("must be non-negative")
+
+
+def legacy_create(create_scene, actors, data, req):
+    main_actors, sub_actors = create_scene.on_stage(actors)
+    roles = [*create_scene.get_actor_role(main_actors).values(), *create_scene.get_actor_role(sub_actors).values()]
+    create_content = {}
+    exceptions = []
+    for role in roles:
+        if role.name not in req:
+            continue
+        value = role.get_value(req)
+        k, v = role.translate(value)
+        exception = role.validate(v)
+        if exception:
+            exceptions.append(exception)
+        create_content[k] = v
+    if exceptions:
+        raise ValueError()
+    for k, v in create_content.items():
+        scene.apply_update_to_obj(data, k, v)
+    return data
+
+
+def build_actors(validated: bool) -> dict[str, actor.APIActor]:
+    actors = {}
+    for i in range(FIELDS):
+        name = f"field{i}"
+        role = JSON_ROLE
+        if validated and i % 4 == 0:
+            class ValidatedRole(JSON_ROLE):
+                __slots__ = ()
+
+                def __init__(self, *args, **kwargs):
+                    super().__init__(*args, validator=non_negative, **kwargs)
+
+            role = ValidatedRole
+        actors[name] = API_ACTOR(name, int, role, MODEL_ROLE, JSON_ROLE)
+    return actors
+
+
+def run(name, func, number):
+    elapsed = timeit.timeit(func, number=number)
+    print(f"{name:<36} {elapsed / number * 1e6:8.1f} us/call")
+
+
+if __name__ == "__main__":
+    payload = {f"field{i}": i for i in range(FIELDS)}
+    payloads = [dict(payload) for _ in range(PAYLOADS)]
+    for validated in (False, True):
+        actors = build_actors(validated)
+        create = scene.CreateScene(scene.Cast(set(actors)))
+        label = "validated" if validated else "no validators"
+        run(f"legacy create ({label})", lambda: legacy_create(create, actors, {}, payload), 20000)
+        run(f"CreateScene ({label})", lambda: create(actors, {}, payload, {}), 20000)
+        run(f"legacy per-field x{PAYLOADS} ({label})",
+            lambda: [legacy_create(create, actors, {}, p) for p in payloads], 20)
+        run(f"validate_many x{PAYLOADS} ({label})", lambda: create.validate_many(actors, payloads), 20)
@@ -0,0 +1,91 @@
+import gc
+import os
+import sys
+
+from fastapi import FastAPI
+
+from core import actor, actor_role, chapter, scenario, scene, warmup
+from core.helper.db_helper import DBHelper
+from sample.models.sample import User
+
+API_ACTOR = actor.APIActor
+JSON_ROLE = actor_role.JsonFieldRole
+MODEL_ROLE = actor_role.ModelFieldRole
+
+CHAPTERS = 40
+FIELDS = 30
+WORKERS = 4
+
+
+def get_uss(pid: int | str = "self") -> int:
+    total = 0
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1]) * 1024
+    return total
+
+
+def build_app() -> tuple[FastAPI, list[chapter.APIChapter]]:
+    app = FastAPI()
+    chapters = []
+    for i in range(CHAPTERS):
+        actors = {"id": API_ACTOR("id", int, JSON_ROLE, MODEL_ROLE, JSON_ROLE)}
+        for j in range(FIELDS):
+            actors[f"field{j}"] = API_ACTOR(f"field{j}", str, JSON_ROLE, MODEL_ROLE, JSON_ROLE, model_name="name")
+        names = set(actors) - {"id"}
+        _scenario = scenario.APIScenario(actors=actors, scenes={
+            "summary": scene.SummaryScene(scene.Cast({"id", "field0"})),
+            "detail": scene.DetailScene(scene.Cast({"id"}, names)),
+            "create": scene.CreateScene(scene.Cast(None, names)),
+            "update": scene.UpdateScene(scene.Cast(None, names)),
+            "delete": scene.DeleteScene(scene.Cast(set())),
+        })
+        _chapter = chapter.APIChapter(f"chapter{i}", DBHelper(User), [_scenario])
+        app.include_router(_chapter.route)
+        chapters.append(_chapter)
+    return app, chapters
+
+
+def serve(app: FastAPI, chapters: list[chapter.APIChapter]) -> None:
+    app.openapi()
+    for _chapter in chapters:
+        warmup.warm_chapter(_chapter)
+    gc.collect()
+
+
+def measure_workers(app: FastAPI, chapters: list[chapter.APIChapter]) -> list[int]:
+    children = []
+    for _ in range(WORKERS):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            serve(app, chapters)
+            os.write(write_fd, str(get_uss()).encode())
+            os._exit(0)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+    sizes = []
+    for pid, read_fd in children:
+        with os.fdopen(read_fd) as f:
+            sizes.append(int(f.read()))
+        os.waitpid(pid, 0)
+    return sizes
+
+
+def report(name: str, sizes: list[int]) -> None:
+    print(f"{name:<28} {sum(sizes) / len(sizes) / 2 ** 20:8.2f} MiB USS/worker "
+          f"(min {min(sizes) / 2 ** 20:.2f}, max {max(sizes) / 2 ** 20:.2f})")
+
+
+if __name__ == "__main__":
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("worker memory bench needs Linux /proc/<pid>/smaps_rollup")
+    app, chapters = build_app()
+    report("lazy (built in worker)", measure_workers(app, chapters))
+    warmup.prefork(app, chapters, freeze=False)
+    report("prefork", measure_workers(app, chapters))
+    gc.collect()
+    gc.freeze()
+    report("prefork + gc.freeze", measure_workers(app, chapters))
@@ -1,16 +1,39 @@
-from typing import Type
+from types import MappingProxyType
+from typing import Optional, Type
 
 from core import actor_role
+from core.frozen import Frozen
 
 RoleType = actor_role.BaseActorRole
+FIELD_ROLE = actor_role.BaseFieldRole
+MODEL_FIELD_ROLE = actor_role.ModelFieldRole
 
+POSITIONS = ("request", "models", "response")
+POSITION_INDEX = {position: index for index, position in enumerate(POSITIONS)}
+
+
+class BaseActor(Frozen):
+    __slots__ = ("roles",)
 
-class BaseActor:
     def __init__(self, roles: dict[str, RoleType] | None = None):
-        self.roles = roles or {}
+        self._init_slots(roles=MappingProxyType(dict(roles) if roles else {}))
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        if isinstance(state["roles"], MappingProxyType):
+            state["roles"] = dict(state["roles"])
+        return state
+
+    def __setstate__(self, state):
+        if isinstance(state["roles"], dict):
+            state = {**state, "roles": MappingProxyType(state["roles"])}
+        super().__setstate__(state)
 
     def set_role(self, role_name, role: RoleType) -> None:
-        self.roles[role_name] = role
+        raise AttributeError("actor roles are fixed at construction, use with_role")
+
+    def with_role(self, role_name, role: RoleType) -> "BaseActor":
+        return self._replace(roles=MappingProxyType({**self.roles, role_name: role}))
 
     def get_role(self, role_name: str) -> RoleType | None:
         role = self.roles.get(role_name, None)
@@ -23,6 +46,8 @@ class BaseActor:
 
 
 class APIActor(BaseActor):
+    __slots__ = ("names", "types")
+
     def __init__(
             self,
             name: str = None,
@@ -38,38 +63,85 @@ class APIActor(BaseActor):
             model_typ: Type[any] = None,
             response_typ: Type[any] = None
     ):
-        super().__init__()
         if name is None and (request_role and model_role):
             raise ValueError("name is required if you use actor")
-        self.name = {
-            "request": request_name or name,
-            "models": model_name or name,
-            "response": response_name or request_name or name,
-        }
+        names = (
+            request_name or name,
+            model_name or name,
+            response_name or request_name or name,
+        )
 
-        if typ is None and (request_role and model_role):
+        if typ is None and (request_role and model_role) and not issubclass(model_role, MODEL_FIELD_ROLE):
             raise ValueError("typ is required if you use actor")
-        self.typ = {
-            "request": request_typ or typ,
-            "models": model_typ or typ,
-            "response": response_typ or request_typ or typ,
-        }
+        types = (
+            request_typ or typ,
+            model_typ or typ,
+            response_typ or request_typ or typ,
+        )
 
         if request_role is None:
             request_role = actor_role.JsonFieldRole
-        request_role_inst = request_role(self.name.get("request"), typ=self.typ.get("request"))
-        model_role_inst = model_role(self.name.get("models"))
-        response_role_inst = response_role(self.name.get("response"), typ=self.typ.get("response")) if response_role \
-            else request_role(self.name.get("response"), typ=self.typ.get("response"))
-        if self.name.get("request") != self.name.get("models"):
-            request_role_inst.translators.append(lambda k, v: (self.name.get("models"), v))
-        if self.name.get("models") != self.name.get("response"):
-            model_role_inst.translators.append(lambda k, v: (self.name.get("response"), v))
-        self.set_role("request", request_role_inst)
-        self.set_role("models", model_role_inst)
-        self.set_role("response", response_role_inst)
+        request_name, model_name, response_name = names
+        request_translator = actor_role.Rename(model_name) if request_name != model_name else None
+        model_translator = actor_role.Rename(response_name) if model_name != response_name else None
+        roles = (
+            request_role(request_name, typ=types[0], translator=request_translator),
+            model_role(model_name, translator=model_translator),
+            (response_role or request_role)(response_name, typ=types[2]),
+        )
+        self._init_slots(roles=roles, names=names, types=types)
+
+    @property
+    def name(self) -> dict[str, str]:
+        return dict(zip(POSITIONS, self.names))
+
+    @property
+    def typ(self) -> dict[str, Type[any]]:
+        return dict(zip(POSITIONS, self.types))
+
+    def get_name(self, role_name: str) -> str:
+        return self.names[self._get_position_index(role_name)]
+
+    def get_typ(self, role_name: str) -> Type[any]:
+        return self.types[self._get_position_index(role_name)]
+
+    def bind(self, model) -> "APIActor":
+        request_role, model_role, response_role = self.roles
+        if not isinstance(model_role, MODEL_FIELD_ROLE):
+            return self
+        model_role = model_role.bind(model)
+        column = model_role.column
+        if column is None or column.typ is None:
+            if None in self.types:
+                raise ValueError(f"typ is required for '{model.__name__}.{model_role.name}'")
+            return self._replace(roles=(request_role, model_role, response_role))
+        request_typ, _, response_typ = self.types
+        if request_typ is None:
+            request_typ = column.typ
+        if response_typ is None:
+            response_typ = Optional[column.typ] if column.nullable else column.typ
+        types = (request_typ, self.types[1] or column.typ, response_typ)
+        if isinstance(request_role, FIELD_ROLE):
+            request_role = request_role.bind_column(column, request_typ)
+        if isinstance(response_role, FIELD_ROLE) and response_role.type is None:
+            response_role = response_role._replace(type=response_typ)
+        return self._replace(roles=(request_role, model_role, response_role), types=types)
+
+    def set_role(self, role_name, role: RoleType) -> None:
+        raise AttributeError("APIActor roles are fixed at construction")
+
+    def with_role(self, role_name, role: RoleType) -> "APIActor":
+        raise AttributeError("APIActor roles are fixed at construction")
 
     def get_role(self, role_name: str) -> RoleType | None:
-        if role_name not in ("request", "models", "response"):
+        return self.roles[self._get_position_index(role_name)]
+
+    def has_role(self, role_name: str) -> bool:
+        return role_name in POSITION_INDEX
+
+    @staticmethod
+    def _get_position_index(role_name: str) -> int:
+        try:
+            return POSITION_INDEX[role_name]
+        except KeyError:
             raise ValueError("role_name must be one of 'request', 'models', 'response'")
-        return self.roles.get(role_name, None)
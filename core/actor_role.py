@@ -1,7 +1,15 @@
+import operator
 from typing import Callable, Type, Optional
 
 from pydantic import Field as PydanticField
 
+from core.frozen import Frozen
+from core.helper import model_helper
+
+COLUMN_INFO = model_helper.ColumnInfo
+
+Translator = Callable[[str, any], any]
+
 STRING = "string"
 HEADER = "header"
 COOKIE = "cookie"
@@ -46,30 +54,94 @@ def create_open_api_param_spec(
     return param_spec
 
 
-class BaseActorRole:
+class Rename(Frozen):
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self._init_slots(name=name)
+
+    def __call__(self, k, v):
+        return self.name, v
+
+
+class Transform(Frozen):
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[[any], any]):
+        self._init_slots(func=func)
+
+    def __call__(self, k, v):
+        return k, self.func(v)
+
+
+def compose_value_funcs(funcs: list[Callable[[any], any]]) -> Callable[[any], any] | None:
+    if not funcs:
+        return None
+    if len(funcs) == 1:
+        return funcs[0]
+    funcs = tuple(funcs)
+
+    def composed(value):
+        for func in funcs:
+            value = func(value)
+        return value
+
+    return composed
+
+
+def get_translators(translator: Translator | tuple[Translator, ...] | list[Translator] | None) -> tuple:
+    if translator is None:
+        return ()
+    if isinstance(translator, (tuple, list)):
+        return tuple(translator)
+    return (translator,)
+
+
+def compile_translators(name: str, translators: tuple) -> tuple[str | None, Callable[[any], any] | None]:
+    key, funcs = name, []
+    for translator in translators:
+        if isinstance(translator, Rename):
+            key = translator.name
+        elif isinstance(translator, Transform):
+            funcs.append(translator.func)
+        else:
+            return None, None
+    return key, compose_value_funcs(funcs)
+
+
+class BaseActorRole(Frozen):
+    __slots__ = ("name", "translators", "validator", "key", "value_translator")
+
     def __init__(
             self,
             name: str,
             *,
-            translator: Callable[[str, any], any] = None,
+            translator: Translator | tuple[Translator, ...] | None = None,
             validator: Callable[[any], Exception | None] = None,
             **kwargs
     ):
-        self.name = name
-        self.translators = [translator] if translator else []
-        self.validator = validator
+        translators = get_translators(translator)
+        key, value_translator = compile_translators(name, translators)
+        self._init_slots(
+            name=name,
+            translators=translators,
+            validator=validator,
+            key=key,
+            value_translator=value_translator,
+        )
 
     def get_value(self, obj) -> any:
         return get_value_from_obj(obj, self.name)
 
     def translate(self, value) -> any:
-        if self.translators:
+        if self.key is None:
             k, v = self.name, value
             for t in self.translators:
                 k, v = t(k, v)
             return k, v
-        else:
-            return self.name, value
+        if self.value_translator is None:
+            return self.key, value
+        return self.key, self.value_translator(value)
 
     def validate(self, value) -> Exception | None:
         if self.validator:
@@ -80,18 +152,19 @@ class BaseActorRole:
 
 
 class BaseFieldRole(BaseActorRole):
+    __slots__ = ("type", "field_args")
+
     def __init__(
             self,
             name: str,
             *,
             typ: Type[any] = str,
-            translator: Callable[[str, any], any] = None,
+            translator: Translator | tuple[Translator, ...] | None = None,
             validator: Callable[[any], Exception | None] = None,
             **kwargs
     ):
         super().__init__(name, translator=translator, validator=validator)
-        self.type = typ
-        self.field_args = kwargs
+        self._init_slots(type=typ, field_args=kwargs)
 
     def get_field_spec(self, required: bool = False, default: any = None, **kwargs):
         if required:
@@ -101,20 +174,28 @@ class BaseFieldRole(BaseActorRole):
             typ = Optional[self.type]
         return self.name, (typ, PydanticField(default, **self.field_args))
 
+    def bind_column(self, column: COLUMN_INFO, typ: Type[any] | None = None) -> "BaseFieldRole":
+        field_args = self.field_args
+        if column.max_length is not None and column.typ is str and "max_length" not in field_args:
+            field_args = {**field_args, "max_length": column.max_length}
+        return self._replace(type=self.type if self.type is not None else typ, field_args=field_args)
+
 
 class QueryFieldRole(BaseFieldRole):
-    pass
+    __slots__ = ()
 
 
 class JsonFieldRole(BaseFieldRole):
-    pass
+    __slots__ = ()
 
 
 class HeaderFieldRole(BaseActorRole):
+    __slots__ = ()
+
     def __init__(
             self,
             name: str,
-            translator: Callable[[str, any], any] = None,
+            translator: Translator | tuple[Translator, ...] | None = None,
             validator: Callable[[any], Exception | None] = None,
             **kwargs
     ):
@@ -137,10 +218,12 @@ class HeaderFieldRole(BaseActorRole):
 
 
 class CookieFieldRole(BaseActorRole):
+    __slots__ = ()
+
     def __init__(
             self,
             name: str,
-            translator: Callable[[str, any], any] = None,
+            translator: Translator | tuple[Translator, ...] | None = None,
             validator: Callable[[any], Exception | None] = None,
             **kwargs
     ):
@@ -163,15 +246,26 @@ class CookieFieldRole(BaseActorRole):
 
 
 class ModelFieldRole(BaseActorRole):
+    __slots__ = ("column", "getter")
+
     def __init__(
             self,
             name: str,
-            translator: Callable[[str, any], any] = None,
+            translator: Translator | tuple[Translator, ...] | None = None,
     ):
         super().__init__(
             name,
             translator=translator,
         )
+        self._init_slots(column=None, getter=operator.attrgetter(name))
+
+    def get_value(self, obj) -> any:
+        if isinstance(obj, dict):
+            return obj.get(self.name)
+        return self.getter(obj)
+
+    def bind(self, model) -> "ModelFieldRole":
+        return self._replace(column=model_helper.get_column_info(model, self.name))
 
     def get_field_spec(self, **kwargs):
         return None
@@ -0,0 +1,150 @@
+import hashlib
+import importlib
+import json
+import os
+import sys
+
+from fastapi import FastAPI
+
+from core import chapter, scene, scenario
+from core.frozen import Frozen
+
+API_CHAPTER = chapter.APIChapter
+SCENE_TYPE = scene.BaseScene
+SCENARIO_TYPE = scenario.Scenario
+
+ARTIFACT_VERSION = 1
+
+
+def get_qualified_name(value) -> str:
+    return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+
+
+def get_code_digest(code) -> str:
+    consts = [get_code_digest(const) if hasattr(const, "co_code") else repr(const) for const in code.co_consts]
+    definition = [code.co_code.hex(), consts, code.co_names, code.co_varnames, code.co_freevars]
+    return hashlib.sha256(json.dumps(definition).encode()).hexdigest()
+
+
+def describe_callable(value):
+    code = getattr(getattr(value, "__func__", value), "__code__", None)
+    if code is None:
+        return get_qualified_name(value)
+    return [get_qualified_name(value), get_code_digest(code)]
+
+
+def describe(value):
+    if isinstance(value, Frozen):
+        state = value.__getstate__()
+        return [get_qualified_name(type(value)), {name: describe(state[name]) for name in sorted(state)}]
+    if isinstance(value, SCENE_TYPE):
+        return [get_qualified_name(type(value)), value.role_name, describe(value.cast), describe(value.func),
+                value.cpu_bound]
+    if isinstance(value, SCENARIO_TYPE):
+        return [get_qualified_name(type(value)), describe(getattr(value, "path", None)), value.independent,
+                describe(value.actors), describe(value.scenes)]
+    if isinstance(value, dict):
+        return {str(k): describe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [describe(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(describe(v) for v in value)
+    if isinstance(value, type):
+        return get_qualified_name(value)
+    if callable(value):
+        return describe_callable(value)
+    return value if value is None or isinstance(value, (str, int, float, bool)) else repr(value)
+
+
+def describe_chapter(_chapter: API_CHAPTER) -> list:
+    expansions = {
+        name: [_expansion.relation, _expansion.scene_name, _expansion.deleted_key, describe(_expansion.scenario)]
+        for name, _expansion in _chapter.expansions.items()
+    }
+    search = None if _chapter.search is None else list(_chapter.search.fields)
+    return [_chapter.prefix, describe(_chapter.scenarios), expansions, search, _chapter.write_behind is not None]
+
+
+def fingerprint(app: FastAPI, chapters: list[API_CHAPTER]) -> str:
+    definition = {
+        "version": ARTIFACT_VERSION,
+        "app": [app.title, app.version, app.openapi_version],
+        "chapters": [describe_chapter(_chapter) for _chapter in chapters],
+    }
+    return hashlib.sha256(json.dumps(definition, sort_keys=True, default=repr).encode()).hexdigest()
+
+
+def get_cast_splits(_scenario: SCENARIO_TYPE) -> dict[str, list[list[str]]]:
+    splits = {}
+    for scene_name, _scene in _scenario.scenes.items():
+        main_actors, sub_actors = _scene.on_stage(_scenario.actors)
+        splits[scene_name] = [list(main_actors), list(sub_actors)]
+    return splits
+
+
+def build_artifact(app: FastAPI, chapters: list[API_CHAPTER]) -> dict:
+    return {
+        "version": ARTIFACT_VERSION,
+        "hash": fingerprint(app, chapters),
+        "chapters": {
+            _chapter.prefix: [get_cast_splits(_scenario) for _scenario in _chapter.scenarios]
+            for _chapter in chapters
+        },
+        "openapi": app.openapi(),
+    }
+
+
+def write_artifact(path: str, app: FastAPI, chapters: list[API_CHAPTER]) -> dict:
+    artifact = build_artifact(app, chapters)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, separators=(",", ":"))
+    os.replace(temp_path, path)
+    return artifact
+
+
+def read_artifact(path: str) -> dict | None:
+    try:
+        with open(path, "rb") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def apply_artifact(artifact: dict, app: FastAPI, chapters: list[API_CHAPTER]) -> None:
+    for _chapter in chapters:
+        for _scenario, splits in zip(_chapter.scenarios, artifact["chapters"][_chapter.prefix]):
+            for scene_name, (main_names, sub_names) in splits.items():
+                _scenario.scenes[scene_name].prime(_scenario.actors, main_names, sub_names)
+    app.openapi_schema = artifact["openapi"]
+
+
+def load_artifact(path: str, app: FastAPI, chapters: list[API_CHAPTER]) -> bool:
+    artifact = read_artifact(path)
+    if artifact is None or artifact.get("version") != ARTIFACT_VERSION:
+        return False
+    if artifact.get("hash") != fingerprint(app, chapters) or artifact["chapters"].keys() != {
+        _chapter.prefix for _chapter in chapters
+    }:
+        return False
+    apply_artifact(artifact, app, chapters)
+    return True
+
+
+def find_chapters(module) -> list[API_CHAPTER]:
+    return [value for value in vars(module).values() if isinstance(value, API_CHAPTER)]
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 2:
+        print("usage: python -m core.artifact <module>:<app> <output>", file=sys.stderr)
+        return 2
+    module_name, _, app_name = argv[0].partition(":")
+    module = importlib.import_module(module_name)
+    artifact = write_artifact(argv[1], getattr(module, app_name or "app"), find_chapters(module))
+    print(f"wrote {argv[1]} ({artifact['hash'][:12]}, {len(artifact['chapters'])} chapters)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
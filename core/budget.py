@@ -0,0 +1,101 @@
+import collections
+import contextlib
+import logging
+
+from core.db import stats
+from core.frozen import Frozen
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    def __init__(self, violation: "Violation"):
+        super().__init__(str(violation))
+        self.violation = violation
+
+
+class QueryBudget(Frozen):
+    __slots__ = ("max_queries", "max_duration")
+
+    def __init__(self, max_queries: int | None = None, max_duration: float | None = None):
+        if max_queries is None and max_duration is None:
+            raise ValueError("query budget needs max_queries or max_duration")
+        self._init_slots(max_queries=max_queries, max_duration=max_duration)
+
+    def check(self, query_stats: stats.QueryStats) -> list[str]:
+        problems = []
+        if self.max_queries is not None and query_stats.count > self.max_queries:
+            problems.append(f"{query_stats.count} queries > {self.max_queries}")
+        if self.max_duration is not None and query_stats.duration > self.max_duration:
+            problems.append(f"{query_stats.duration * 1000:.1f}ms in SQL > {self.max_duration * 1000:.1f}ms")
+        return problems
+
+
+class Violation(Frozen):
+    __slots__ = ("chapter", "scene", "problems", "statements")
+
+    def __init__(self, chapter: str, scene: str, problems: list[str], statements: list[str]):
+        self._init_slots(chapter=chapter, scene=scene, problems=tuple(problems), statements=tuple(statements))
+
+    def __str__(self):
+        lines = [f"{self.chapter} {self.scene}: {', '.join(self.problems)}"]
+        lines += [f"  {statement}" for statement in self.statements]
+        return "\n".join(lines)
+
+
+class QueryBudgetGuard:
+    def __init__(
+            self,
+            budgets: dict[str, QueryBudget],
+            *,
+            default: QueryBudget | None = None,
+            raise_on_exceed: bool = False,
+            history: int = 100,
+    ):
+        self.budgets = budgets
+        self.default = default
+        self.raise_on_exceed = raise_on_exceed
+        self.violations = collections.deque(maxlen=history)
+
+    def get_budget(self, scene: str) -> QueryBudget | None:
+        return self.budgets.get(scene, self.default)
+
+    def check(self, chapter: str, scene: str, query_stats: stats.QueryStats) -> None:
+        problems = self.get_budget(scene).check(query_stats)
+        if not problems:
+            return
+        statements = [" ".join(statement.split()) for statement, _ in query_stats.statements or ()]
+        violation = Violation(chapter, scene, problems, statements)
+        self.violations.append(violation)
+        if self.raise_on_exceed:
+            raise QueryBudgetExceeded(violation)
+        logger.warning("query budget exceeded: %s", violation)
+
+    @contextlib.contextmanager
+    def track(self, chapter: str, scene: str):
+        if self.get_budget(scene) is None:
+            yield None
+            return
+        with stats.track(capture=True) as query_stats:
+            yield query_stats
+            self.check(chapter, scene, query_stats)
+
+
+class BudgetRegistry:
+    def __init__(self):
+        self.guards = {}
+        self.chapters = {}
+
+    def register(self, chapter, guard: QueryBudgetGuard) -> None:
+        self.guards[chapter.name] = guard
+        self.chapters[chapter.name] = chapter
+
+    def get_guards(self) -> dict[str, QueryBudgetGuard]:
+        return dict(self.guards)
+
+    def get_chapters(self) -> dict:
+        return dict(self.chapters)
+
+    def clear_violations(self) -> None:
+        for guard in self.guards.values():
+            guard.violations.clear()
@@ -1,20 +1,56 @@
-from fastapi import APIRouter, Depends, Request
+import contextlib
+import functools
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
-from core import scenario
+from core import actor, actor_role, budget, concurrency, expansion, metrics, profiler, scene, scenario, search
+from core import validation, write_behind
+from core.db import routing, session
 from core.depends import depends
-from core.request import pageable
-from core.response import catalog
+from core.request import aggregate, export, pageable, projection
+from core.response import catalog, compression, formats
 from core.helper.schema_helper import HeaderAndCookieSchemaHelper, QuerySchemaHelper, JsonSchemaHelper
-from core.helper import db_helper
+from core.helper import cache_helper, db_helper, filter_helper
 
 DB_HELPER = db_helper.DBHelper
+AGGREGATES = db_helper.AGGREGATES
+FILTER_COMPILER = filter_helper.FilterCompiler
+TTL_CACHE = cache_helper.TTLCache
+API_ACTOR = actor.APIActor
+MODEL_FIELD_ROLE = actor_role.ModelFieldRole
 
 CATALOG_RESPONSE = catalog.CatalogResponse
+COMPRESSION_POLICY = compression.CompressionPolicy
+ENCODED_BODY = compression.EncodedBody
 PAGEABLE_REQUEST = pageable.QueryPageParams
+PROJECTION_REQUEST = projection.ProjectionParams
+AGGREGATE_REQUEST = aggregate.AggregateParams
+EXPORT_REQUEST = export.ExportParams
 API_SCENARIO = scenario.APIScenario
+PROJECTION_LAYOUT = scenario.ProjectionLayout
+CONCURRENT_RUNNER = concurrency.ConcurrentRunner
+API_EXPANSION = expansion.APIExpansion
+API_SEARCH = search.APISearch
+WRITE_BEHIND = write_behind.WriteBehind
+METRICS_REGISTRY = metrics.MetricsRegistry
+RECORD_ROWS = metrics.record_rows
+RECORD_CACHE = metrics.record_cache
+SLOW_REQUEST_PROFILER = profiler.SlowRequestProfiler
+QUERY_BUDGET_GUARD = budget.QueryBudgetGuard
+BUDGET_REGISTRY = budget.BudgetRegistry
+QUEUE_FULL = write_behind.QueueFull
+QUEUED = write_behind.QUEUED
+
+SCENE_VALIDATION_ERROR = validation.SceneValidationError
 
 GET_DB = depends.get_db
+GET_ROUTED_DB = depends.get_routed_db
+GET_CLIENT_ID = depends.get_client_id
+SESSION_ROUTER = routing.SessionRouter
 
 
 def extract_field_from_dict_obj(obj, field_names: list, defaults=None):
@@ -32,18 +68,132 @@ def get_default_from_header_specs(fields):
             for spec in fields}
 
 
+def get_model_fields(scenarios: list[API_SCENARIO], column_keys) -> dict[str, str]:
+    fields = {}
+    for _scenario in scenarios:
+        if _scenario.path["models"] is not None:
+            continue
+        for _actor in _scenario.actors.values():
+            if not isinstance(_actor, API_ACTOR) or not isinstance(_actor.get_role("models"), MODEL_FIELD_ROLE):
+                continue
+            model_name = _actor.get_name("models")
+            if model_name in column_keys:
+                fields[_actor.get_name("response")] = model_name
+    return fields
+
+
 class APIChapter:
     def __init__(
             self,
             prefix: str,
             connector: DB_HELPER,
-            scenarios: list[API_SCENARIO]
+            scenarios: list[API_SCENARIO],
+            *,
+            router: SESSION_ROUTER | None = None,
+            fields_cache_size: int = 128,
+            expansions: list[API_EXPANSION] | None = None,
+            aggregate_ttl: float = 5.0,
+            aggregate_cache_size: int = 256,
+            search: API_SEARCH | None = None,
+            write_behind: WRITE_BEHIND | None = None,
+            runner: CONCURRENT_RUNNER | None = None,
+            compression: COMPRESSION_POLICY | None = None,
+            response_cache_ttl: float = 0.0,
+            response_cache_size: int = 1024,
+            export_limit: int = 100000,
+            metrics: METRICS_REGISTRY | None = None,
+            profiler: SLOW_REQUEST_PROFILER | None = None,
+            budget_guard: QUERY_BUDGET_GUARD | None = None,
+            budget_registry: BUDGET_REGISTRY | None = None,
     ):
         self.name = prefix
         self.prefix = "/" + prefix
         self.connector = connector
-        self.scenarios = scenarios
+        self.scenarios = [_scenario.bind(connector.model) for _scenario in scenarios]
+        self.router = router
         self.api_docs = {}
+        self._router = None
+        self._openapi_fragment = None
+        self.layouts = {}
+        self.runner = runner
+        self.get_narrowed_layout = functools.lru_cache(maxsize=fields_cache_size)(self._narrow_layout)
+        self.expansions = {_expansion.name: _expansion.bind(connector.model) for _expansion in expansions or []}
+        self.model_fields = get_model_fields(self.scenarios, connector.column_keys)
+        self.filter_compiler = FILTER_COMPILER(connector.model, self.model_fields)
+        self.aggregate_cache = TTL_CACHE(aggregate_ttl, aggregate_cache_size)
+        self.search = search.bind(connector.model) if search else None
+        self.compression = compression
+        self.response_cache = TTL_CACHE(response_cache_ttl, response_cache_size) if response_cache_ttl > 0 else None
+        self.export_limit = export_limit
+        self.metrics = metrics
+        self.profiler = profiler
+        self.budget_guard = budget_guard
+        if budget_guard is not None and budget_registry is not None:
+            budget_registry.register(self, budget_guard)
+        self.write_behind = self._bind_write_behind(write_behind) if write_behind else None
+
+    def _bind_write_behind(self, _write_behind: WRITE_BEHIND) -> WRITE_BEHIND:
+        if self.search is not None:
+            raise ValueError("write-behind create cannot maintain a search index")
+        if any(_scenario.has_scene("create") and _scenario.path["models"] for _scenario in self.scenarios):
+            raise ValueError("write-behind create cannot reconcile child collections")
+        return _write_behind.bind(self.connector, self.get_primary_sessionmaker(), self.invalidate)
+
+    def get_primary_sessionmaker(self):
+        return self.router.primary if self.router is not None else session.SessionLocal
+
+    def create_search_index(self) -> bool:
+        with self.get_primary_sessionmaker()() as db:
+            created = self.search.ensure_index(db.connection())
+            db.commit()
+        return created
+
+    # Caches are per process: writes served by other workers only show up once entries expire.
+    def invalidate(self):
+        self.aggregate_cache.clear()
+        if self.response_cache is not None:
+            self.response_cache.clear()
+
+    @property
+    def encodes_responses(self) -> bool:
+        return self.compression is not None or self.response_cache is not None
+
+    def is_pinned(self, request: Request) -> bool:
+        return self.router is not None and self.router.is_sticky(GET_CLIENT_ID(request))
+
+    def _respond(self, request: Request, key: tuple, render, fmt: str = formats.JSON):
+        cache = None if self.is_pinned(request) else self.response_cache
+        body = None if cache is None else cache.get(key)
+        if cache is not None:
+            RECORD_CACHE("response", body is not None)
+        if body is None:
+            body = ENCODED_BODY(render(), formats.MEDIA_TYPES[fmt])
+            if cache is not None:
+                cache.set(key, body)
+        response = (self.compression or compression.IDENTITY).respond(request, body)
+        response.headers.add_vary_header("Accept")
+        return response
+
+    def _instrument(self, scene_name: str, endpoint):
+        if self.metrics is None and self.profiler is None and self.budget_guard is None:
+            return endpoint
+
+        @functools.wraps(endpoint)
+        def instrumented(*args, **kwargs):
+            with contextlib.ExitStack() as stack:
+                if self.profiler is not None:
+                    stack.enter_context(self.profiler.track(self.name, scene_name))
+                sample = None
+                if self.metrics is not None:
+                    sample = stack.enter_context(self.metrics.track(self.name, scene_name))
+                if self.budget_guard is not None:
+                    stack.enter_context(self.budget_guard.track(self.name, scene_name))
+                response = endpoint(*args, **kwargs)
+                if sample is not None:
+                    sample.respond(response)
+                return response
+
+        return instrumented
 
     def docs(self):
         if self.api_docs:
@@ -63,7 +213,7 @@ class APIChapter:
                     query_schema.add_fields(spec.get("query", []))
                     if name is None:
                         json_schema.add_fields(spec.get("json", []))
-                    elif isinstance(scenario_api_spec, list):
+                    elif isinstance(scenario_api_spec, list) or self.connector.is_collection(_scenario.path["models"]):
                         json_schema.add_nested_list_schema(name, spec.get("json", []))
                     else:
                         json_schema.add_nested_schema(name, spec.get("json", []))
@@ -96,73 +246,332 @@ class APIChapter:
         cookie = self.api_docs.get(scene_name, {}).get("cookie", [])
         return json, query, header, cookie
 
-    def _get_detail(self, result):
-        detail = {}
+    def _is_read_only(self, scene_name: str):
+        return all(_scenario.is_read_only(scene_name) for _scenario in self.scenarios)
+
+    def _get_db_dependency(self, scene_name: str):
+        if self.router is None:
+            return GET_DB
+        mode = routing.READ if self._is_read_only(scene_name) else routing.WRITE
+        return GET_ROUTED_DB(mode, self.router)
+
+    def validate_many(self, scene_name: str, payloads: list[dict]) -> list[dict]:
+        errors = []
+        for _scenario in self.scenarios:
+            errors.extend(_scenario.validate_many(scene_name, payloads))
+        return errors
+
+    def _play_write_scene(self, scene_name: str, entity, payload: dict, extra: dict = None):
+        result = None
+        errors = []
+        extra = {} if extra is None else extra
         for _scenario in self.scenarios:
-            value = _scenario("detail", result, {}, {})
-            detail = _scenario.inject_to_response(detail, value)
-        return detail
+            try:
+                value = _scenario(scene_name, entity, payload, extra)
+            except SCENE_VALIDATION_ERROR as e:
+                errors.extend(e.errors)
+                continue
+            if value is not None:
+                result = value
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
+        return result
+
+    def _apply_children(self, db: Session, entity, extra: dict):
+        children = extra.get(scenario.CHILDREN)
+        if not children:
+            return False
+        self.connector.apply(db, entity)
+        self.connector.flush(db)
+        for relation, rows, loc, deleted_key in children:
+            self.connector.reconcile_children(db, entity, relation, rows, deleted_key, loc)
+        return True
+
+    def _index(self, db: Session, entity, changes: dict | None = None):
+        if self.search is None:
+            return
+        if changes is not None and not changes.keys() & set(self.search.fields):
+            return
+        self.connector.apply(db, entity)
+        self.connector.flush(db)
+        self.search.index(db, entity)
+
+    def get_match(self, db: Session, q: str | None):
+        if not q or not q.strip() or self.search is None:
+            return None
+        return self.search.match(db, q)
+
+    def get_layout(self, scene_name: str) -> PROJECTION_LAYOUT:
+        layout = self.layouts.get(scene_name, None)
+        if layout is None:
+            layout = PROJECTION_LAYOUT(scene_name, self.scenarios, self.runner)
+            self.layouts[scene_name] = layout
+        return layout
+
+    def _narrow_layout(self, scene_name: str, fields: frozenset[str]) -> PROJECTION_LAYOUT:
+        return self.get_layout(scene_name).narrow(fields)
+
+    def get_plan(self, scene_name: str, fields: frozenset[str] | None):
+        if fields is None:
+            return self.get_layout(scene_name), None
+        keys = self.get_layout(scene_name).keys
+        unknown = None if keys is None else fields - keys - self.expansions.keys()
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"unknown field: {', '.join(sorted(unknown))}")
+        layout = self.get_narrowed_layout(scene_name, fields)
+        return layout, layout.columns
+
+    def get_expansions(self, names: frozenset[str]) -> list[API_EXPANSION]:
+        unknown = names - self.expansions.keys()
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"unknown expand: {', '.join(sorted(unknown))}")
+        return [self.expansions[name] for name in sorted(names)]
+
+    @staticmethod
+    def _expand(db: Session, expansions: list[API_EXPANSION], entities: list, results: list[dict]):
+        for _expansion in expansions:
+            _expansion.queue(db, entities)
+        for _expansion in expansions:
+            for result, value in zip(results, _expansion.load(db, entities)):
+                result[_expansion.name] = value
+
+    @staticmethod
+    def _get_columns(db: Session, layout: PROJECTION_LAYOUT, expansions: list[API_EXPANSION], entities: list):
+        columns = layout.project_columns(entities)
+        if columns is None:
+            columns = formats.rows_to_columns([layout(entity) for entity in entities])
+        for _expansion in expansions:
+            _expansion.queue(db, entities)
+        for _expansion in expansions:
+            columns[_expansion.name] = list(_expansion.load(db, entities))
+        return columns
+
+    @staticmethod
+    def _get_expansion_columns(columns: tuple[str, ...] | None, expansions: list[API_EXPANSION]):
+        if columns is None or not expansions:
+            return columns
+        return columns + tuple(_expansion.local_key for _expansion in expansions)
+
+    def get_aggregate_plan(self, group_by: tuple[str, ...], metrics: tuple[tuple[str, str | None], ...]):
+        unknown = [name for name in group_by if name not in self.model_fields]
+        unknown += [name for _, name in metrics if name is not None and name not in self.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"unknown field: {', '.join(sorted(set(unknown)))}")
+        for fn, name in metrics:
+            if fn not in AGGREGATES:
+                raise HTTPException(status_code=400, detail=f"unknown metric: {fn}")
+            if name is None and fn != "count":
+                raise HTTPException(status_code=400, detail=f"metric '{fn}' needs a field")
+        return (
+            [(name, self.model_fields[name]) for name in group_by],
+            [(fn if name is None else f"{fn}_{name}", fn, self.model_fields.get(name)) for fn, name in metrics],
+        )
+
+    def _get_detail(self, result):
+        return self.get_layout("detail")(result)
+
+    def _find_catalog(self, db: Session, page_param, projection_param, offset: int, limit: int):
+        fields = projection_param.get_fields()
+        expansions = self.get_expansions(projection_param.get_expand())
+        layout, columns = self.get_plan("summary", fields)
+        columns = self._get_expansion_columns(columns, expansions)
+
+        filter_args = self.filter_compiler(page_param.get_filter_params())
+        match = self.get_match(db, page_param.get_search_params())
+        entities, total = self.connector.find_and_count(db, filter_args=filter_args, offset=offset, limit=limit,
+                                                        columns=columns, match=match)
+        RECORD_ROWS(len(entities))
+        return entities, total, layout, expansions, fields
+
+    def _get_catalog(self, db: Session, page_param, projection_param, json):
+        offset, limit = page_param.get_offset_and_limit()
+        entities, total, layout, expansions, fields = self._find_catalog(db, page_param, projection_param,
+                                                                          offset, limit)
+        summaries = [layout(entity) for entity in entities]
+        self._expand(db, expansions, entities, summaries)
+
+        content = {"summaries": summaries, "length": len(summaries), "total": total}
+        if fields is not None or expansions:
+            return content, None
+        return content, CATALOG_RESPONSE[json]
+
+    def _render_catalog(self, fmt: str, db: Session, page_param, projection_param, json) -> bytes:
+        if fmt != formats.ARROW:
+            return formats.RENDERERS[fmt](*self._get_catalog(db, page_param, projection_param, json))
+        offset, limit = page_param.get_offset_and_limit()
+        entities, total, layout, expansions, _ = self._find_catalog(db, page_param, projection_param,
+                                                                    offset, limit)
+        columns = self._get_columns(db, layout, expansions, entities)
+        return formats.render_arrow(columns, layout.types, {"total": total, "length": len(entities)})
 
     def _add_catalog_endpoint(self, router: APIRouter):
         if self.api_docs.get("summary", None) is None:
             self.docs()
 
         json, query, header, cookie = self._get_docs_type("summary")
+        get_db = self._get_db_dependency("summary")
 
         def _catalog(
                 request: Request,
                 page_param=Depends(PAGEABLE_REQUEST),
-                db: Session = Depends(GET_DB),
+                projection_param=Depends(PROJECTION_REQUEST),
+                db: Session = Depends(get_db),
                 query_param=Depends(query),
         ):
             header_param = self._get_header_field(request, "summary")
             cookie_param = self._get_cookie_field(request, "summary")
 
-            offset, limit = page_param.get_offset_and_limit()
+            fmt = formats.negotiate(request)
+            if fmt != formats.JSON or self.encodes_responses:
+                key = ("summary", fmt, tuple(sorted(request.query_params.multi_items())))
+                return self._respond(
+                    request, key, lambda: self._render_catalog(fmt, db, page_param, projection_param, json), fmt
+                )
+            content, model = self._get_catalog(db, page_param, projection_param, json)
+            if model is None:
+                return JSONResponse(jsonable_encoder(content))
+            return model(**content)
 
-            entities, total = self.connector.find_and_count(db, offset, limit)
-            summaries = []
+        router.add_api_route(
+            "",
+            endpoint=self._instrument("summary", _catalog),
+            methods=["GET"],
+            response_model=CATALOG_RESPONSE[json]
+        )
 
-            for entity in entities:
-                summary = {}
-                for _scenario in self.scenarios:
-                    value = _scenario("summary", entity, {}, {})
-                    summary = _scenario.inject_to_response(summary, value)
-                summaries.append(summary)
+    def _add_aggregate_endpoint(self, router: APIRouter):
+        get_db = self._get_db_dependency("summary")
 
-            return CATALOG_RESPONSE[json](summaries=summaries, total=total, length=len(summaries))
+        def _aggregate(
+                request: Request,
+                aggregate_param=Depends(AGGREGATE_REQUEST),
+                db: Session = Depends(get_db),
+        ):
+            group_by, metrics = aggregate_param.get_group_by(), aggregate_param.get_metrics()
+            key = (group_by, metrics, aggregate_param.get_filter_params())
+            pinned = self.is_pinned(request)
+            groups = None if pinned else self.aggregate_cache.get(key)
+            if not pinned:
+                RECORD_CACHE("aggregate", groups is not None)
+            if groups is None:
+                group_columns, metric_columns = self.get_aggregate_plan(group_by, metrics)
+                filter_args = self.filter_compiler(aggregate_param.get_filter_params())
+                groups = self.connector.aggregate(db, group_columns, metric_columns, filter_args)
+                if not pinned:
+                    self.aggregate_cache.set(key, groups)
+            return JSONResponse(jsonable_encoder({"groups": groups}))
 
         router.add_api_route(
-            "",
-            endpoint=_catalog,
+            "/_aggregate",
+            endpoint=self._instrument("aggregate", _aggregate),
             methods=["GET"],
-            response_model=CATALOG_RESPONSE[json]
         )
 
+    def _render_export(self, fmt: str, db: Session, export_param, projection_param) -> bytes:
+        entities, total, layout, expansions, _ = self._find_catalog(db, export_param, projection_param,
+                                                                    0, self.export_limit)
+        if fmt == formats.ARROW:
+            columns = self._get_columns(db, layout, expansions, entities)
+            return formats.render_arrow(columns, layout.types, {"total": total, "length": len(entities)})
+        rows = [layout(entity) for entity in entities]
+        self._expand(db, expansions, entities, rows)
+        return formats.RENDERERS[fmt](rows)
+
+    def _add_export_endpoint(self, router: APIRouter):
+        get_db = self._get_db_dependency("summary")
+
+        def _export(
+                request: Request,
+                export_param=Depends(EXPORT_REQUEST),
+                projection_param=Depends(PROJECTION_REQUEST),
+                db: Session = Depends(get_db),
+        ):
+            fmt = formats.negotiate(request)
+            key = ("export", fmt, tuple(sorted(request.query_params.multi_items())))
+            return self._respond(
+                request, key, lambda: self._render_export(fmt, db, export_param, projection_param), fmt
+            )
+
+        router.add_api_route(
+            "/_export",
+            endpoint=self._instrument("export", _export),
+            methods=["GET"],
+        )
+
+    def _enqueue(self, entity):
+        try:
+            ticket = self.write_behind.submit(self.connector.get_insert_mapping(entity))
+        except QUEUE_FULL:
+            raise HTTPException(status_code=503, detail="Write queue is full",
+                                headers={"Retry-After": str(max(1, round(self.write_behind.interval)))})
+        return JSONResponse(
+            status_code=202,
+            content={"ticket": ticket, "status": QUEUED},
+            headers={"Location": f"{self.prefix}/_tickets/{ticket}"},
+        )
+
+    def _add_ticket_endpoint(self, router: APIRouter):
+        def _ticket(ticket: str):
+            status = self.write_behind.status(ticket)
+            if status is None:
+                raise HTTPException(status_code=404, detail="Ticket not found")
+            return {"ticket": ticket, "status": status}
+
+        router.add_api_route(
+            "/_tickets/{ticket}",
+            endpoint=self._instrument("ticket", _ticket),
+            methods=["GET"],
+        )
+
+    def _get_detail_content(self, db: Session, item_id: int, projection_param, json):
+        fields = projection_param.get_fields()
+        expansions = self.get_expansions(projection_param.get_expand())
+        layout, columns = self.get_plan("detail", fields)
+        columns = self._get_expansion_columns(columns, expansions)
+
+        entity = self.connector.get(db, item_id, columns=columns)
+        RECORD_ROWS(1)
+
+        detail = layout(entity)
+        self._expand(db, expansions, [entity], [detail])
+
+        if fields is not None or expansions:
+            return detail, None
+        return detail, json
+
     def _add_detail_endpoint(self, router: APIRouter):
         if self.api_docs.get("detail", None) is None:
             self.docs()
 
         json, query, header, cookie = self._get_docs_type("detail")
+        get_db = self._get_db_dependency("detail")
 
         def _detail(
                 item_id: int,
                 request: Request,
-                db: Session = Depends(GET_DB),
+                projection_param=Depends(PROJECTION_REQUEST),
+                db: Session = Depends(get_db),
                 query_param=Depends(query),
         ):
             header_param = self._get_header_field(request, "detail")
             cookie_param = self._get_cookie_field(request, "detail")
 
-            entity = self.connector.get(db, item_id)
-
-            detail = self._get_detail(entity)
-
-            return detail
+            fmt = formats.negotiate(request, formats.ROW_FORMATS)
+            if fmt != formats.JSON or self.encodes_responses:
+                key = ("detail", fmt, item_id, tuple(sorted(request.query_params.multi_items())))
+                return self._respond(
+                    request, key,
+                    lambda: formats.RENDERERS[fmt](*self._get_detail_content(db, item_id, projection_param, json)),
+                    fmt,
+                )
+            content, model = self._get_detail_content(db, item_id, projection_param, json)
+            if model is None:
+                return JSONResponse(jsonable_encoder(content))
+            return content
 
         router.add_api_route(
             "/{item_id}",
-            endpoint=_detail,
+            endpoint=self._instrument("detail", _detail),
             methods=["GET"],
             response_model=json
         )
@@ -172,32 +581,35 @@ class APIChapter:
             self.docs()
 
         json, query, header, cookie = self._get_docs_type("create")
+        get_db = self._get_db_dependency("create")
         response_model = self.api_docs.get("detail", {}).get("json", {})
 
         def create(
                 request: Request,
                 json_param: json,
-                db: Session = Depends(GET_DB),
+                db: Session = Depends(get_db),
                 query_param=Depends(query),
         ):
             header_param = self._get_header_field(request, "create")
             cookie_param = self._get_cookie_field(request, "create")
 
             entity = self.connector.create_entity()
-            result = None
-            for _scenario in self.scenarios:
-                value = _scenario("create", entity, json_param.dict(), {})
-                if value is not None:
-                    result = value
+            extra = {}
+            result = self._play_write_scene("create", entity, json_param.dict(), extra)
+            if self.write_behind is not None:
+                return self._enqueue(result)
 
+            self._apply_children(db, result, extra)
+            self._index(db, result)
             self.connector.apply_commit_refresh(db, result)
+            self.invalidate()
             detail = self._get_detail(result)
 
             return detail
 
         router.add_api_route(
             "",
-            endpoint=create,
+            endpoint=self._instrument("create", create),
             methods=["POST"],
             response_model=response_model
         )
@@ -207,34 +619,37 @@ class APIChapter:
             self.docs()
 
         json, query, header, cookie = self._get_docs_type("update")
+        get_db = self._get_db_dependency("update")
         response_model = self.api_docs.get("detail", {}).get("json", {})
 
         def _update(
                 item_id: int,
                 request: Request,
                 json_param: json,
-                db: Session = Depends(GET_DB),
+                db: Session = Depends(get_db),
                 query_param=Depends(query),
         ):
             header_param = self._get_header_field(request, "update")
             cookie_param = self._get_cookie_field(request, "update")
 
             entity = self.connector.get(db, item_id)
+            self.connector.check_version(entity, request.headers.get("if-match"))
 
-            result = None
-            for _scenario in self.scenarios:
-                value = _scenario("update", entity, json_param.dict(exclude_none=True), {})
-                if value is not None:
-                    result = value
+            extra = {}
+            result = self._play_write_scene("update", entity, json_param.dict(exclude_none=True), extra)
 
-            self.connector.apply_commit_refresh(db, result)
+            has_children = self._apply_children(db, result, extra)
+            self._index(db, result, extra.get(scene.CHANGES, {}))
+            if has_children or extra.get(scene.CHANGES) or self.connector.has_pending_changes(db):
+                self.connector.apply_commit_refresh(db, result)
+                self.invalidate()
             detail = self._get_detail(result)
 
             return detail
 
         router.add_api_route(
             "/{item_id}",
-            endpoint=_update,
+            endpoint=self._instrument("update", _update),
             methods=["PUT"],
             response_model=response_model
         )
@@ -244,12 +659,13 @@ class APIChapter:
             self.docs()
 
         json, query, header, cookie = self._get_docs_type("delete")
+        get_db = self._get_db_dependency("delete")
         detail_json = self.api_docs.get("detail", {}).get("json", {})
 
         def delete(
                 item_id: int,
                 request: Request,
-                db: Session = Depends(GET_DB),
+                db: Session = Depends(get_db),
                 query_param=Depends(query),
         ):
             header_param = self._get_header_field(request, "delete")
@@ -263,22 +679,43 @@ class APIChapter:
                 if temp is not None:
                     result = temp
 
+            if self.search is not None:
+                self.search.remove(db, result)
             self.connector.apply_commit_refresh(db, result)
+            self.invalidate()
             detail = self._get_detail(result)
 
             return detail
 
         router.add_api_route(
             "/{item_id}",
-            endpoint=delete,
+            endpoint=self._instrument("delete", delete),
             methods=["DELETE"],
             response_model=detail_json
         )
 
+    def openapi_fragment(self) -> dict:
+        if self._openapi_fragment is None:
+            document = get_openapi(title=self.name, version="", routes=self.route.routes)
+            self._openapi_fragment = {"paths": document.get("paths", {}), "components": document.get("components", {})}
+        return self._openapi_fragment
+
     @property
     def route(self):
+        if self._router is None:
+            self._router = self._build_router()
+        return self._router
+
+    def _build_router(self):
         router = APIRouter(prefix=self.prefix)
         self._add_catalog_endpoint(router)
+        self._add_aggregate_endpoint(router)
+        self._add_export_endpoint(router)
+        if self.write_behind is not None:
+            self._add_ticket_endpoint(router)
+            router.add_event_handler("shutdown", self.write_behind.close)
+        if self.search is not None:
+            router.add_event_handler("startup", self.create_search_index)
         self._add_detail_endpoint(router)
         self._add_create_endpoint(router)
         self._add_update_endpoint(router)
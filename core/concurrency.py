@@ -0,0 +1,86 @@
+import asyncio
+import contextvars
+import inspect
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from anyio import from_thread
+
+
+async def resolve(value):
+    if isinstance(value, list):
+        return list(await asyncio.gather(*[resolve(v) for v in value]))
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+async def resolve_all(values: list) -> list:
+    return list(await asyncio.gather(*[resolve(value) for value in values]))
+
+
+def run_coroutine(func, *args):
+    try:
+        return from_thread.run(func, *args)
+    except RuntimeError:
+        return asyncio.run(func(*args))
+
+
+class ConcurrentRunner:
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="scenario")
+        return self._executor
+
+    def resolve(self, value):
+        if isinstance(value, list) and not any(inspect.isawaitable(v) for v in value):
+            return value
+        if not isinstance(value, list) and not inspect.isawaitable(value):
+            return value
+        return run_coroutine(resolve, value)
+
+    def run(self, calls: list[tuple[any, bool]]) -> list:
+        if len(calls) == 1:
+            call, _ = calls[0]
+            return [self.resolve(call())]
+        futures = {
+            index: self.executor.submit(contextvars.copy_context().run, call)
+            for index, (call, is_async) in enumerate(calls) if not is_async
+        }
+        async_indexes = [index for index, (_, is_async) in enumerate(calls) if is_async]
+        results = [None] * len(calls)
+        if async_indexes:
+            values = run_coroutine(resolve_all, [calls[index][0]() for index in async_indexes])
+            for index, value in zip(async_indexes, values):
+                results[index] = value
+        for index, future in futures.items():
+            results[index] = self.resolve(future.result())
+        return results
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait)
+
+
+_default_runner = None
+_default_lock = threading.Lock()
+
+
+def get_default_runner() -> ConcurrentRunner:
+    global _default_runner
+    if _default_runner is None:
+        with _default_lock:
+            if _default_runner is None:
+                _default_runner = ConcurrentRunner()
+    return _default_runner
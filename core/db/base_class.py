@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger
+from sqlalchemy import Column, BigInteger, Integer
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 from sqlalchemy.orm.exc import DetachedInstanceError
 
@@ -9,7 +9,7 @@ def to_snake_case(camel_str: str) -> str:
 
 @as_declarative()
 class Base:
-    id: int = Column(BigInteger, primary_key=True, index=True)
+    id: int = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True)
     __name__: str
 
     # Generate __tablename__ automatically
@@ -36,3 +36,12 @@ class Base:
         if at_least_one_attached_attribute:
             return f"<{self.__class__.__name__}({','.join(field_strings)})>"
         return f"<{self.__class__.__name__} {id(self)}>"
+
+
+class Versioned:
+    version: int = Column(Integer, nullable=False)
+
+    # UPDATEs are issued as "... WHERE id = ? AND version = ?", stale writers get StaleDataError
+    @declared_attr
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.version}
@@ -0,0 +1,94 @@
+from collections import defaultdict
+
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session
+
+LOADER_KEY = "request_loader"
+
+
+def get_primary_key(model):
+    primary_key = inspect(model).primary_key
+    if len(primary_key) != 1:
+        raise ValueError(f"'{model.__name__}' needs a single-column primary key to be batch loaded")
+    return primary_key[0]
+
+
+class Deferred:
+    __slots__ = ("loader", "model", "key")
+
+    def __init__(self, loader: "RequestLoader", model, key):
+        self.loader = loader
+        self.model = model
+        self.key = key
+
+    def get(self):
+        return self.loader.get(self.model, self.key)
+
+
+class RequestLoader:
+    def __init__(self, db: Session):
+        self.db = db
+        self._pending = defaultdict(set)
+        self._loaded = defaultdict(dict)
+
+    def load(self, model, key) -> None:
+        if key is None or key in self._loaded[model]:
+            return
+        entity = self.db.identity_map.get(inspect(model).identity_key_from_primary_key([key]))
+        if entity is not None:
+            self._loaded[model][key] = entity
+        else:
+            self._pending[model].add(key)
+
+    def load_many(self, model, keys) -> None:
+        for key in keys:
+            self.load(model, key)
+
+    def defer(self, model, key) -> Deferred:
+        self.load(model, key)
+        return Deferred(self, model, key)
+
+    def dispatch(self, model) -> None:
+        keys = self._pending.pop(model, None)
+        if not keys:
+            return
+        primary_key = get_primary_key(model)
+        attr = inspect(model).get_property_by_column(primary_key).key
+        loaded = self._loaded[model]
+        for entity in self.db.execute(select(model).where(primary_key.in_(keys))).scalars():
+            loaded[getattr(entity, attr)] = entity
+        for key in keys:
+            loaded.setdefault(key, None)
+
+    def get(self, model, key):
+        if key not in self._loaded[model]:
+            self.load(model, key)
+            self.dispatch(model)
+        return self._loaded[model].get(key)
+
+    def get_many(self, model, keys) -> list:
+        self.load_many(model, keys)
+        return [self.get(model, key) for key in keys]
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._loaded.clear()
+
+
+def attach_loader(db: Session) -> RequestLoader:
+    loader = RequestLoader(db)
+    db.info[LOADER_KEY] = loader
+    return loader
+
+
+def get_loader(db: Session) -> RequestLoader:
+    loader = db.info.get(LOADER_KEY)
+    if loader is None:
+        loader = attach_loader(db)
+    return loader
+
+
+def clear_loader(db: Session) -> None:
+    loader = db.info.get(LOADER_KEY)
+    if loader is not None:
+        loader.clear()
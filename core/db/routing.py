@@ -0,0 +1,77 @@
+import itertools
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+READ = "read"
+WRITE = "write"
+
+
+class SessionRouter:
+    def __init__(
+            self,
+            primary: sessionmaker,
+            replicas: list[sessionmaker] | None = None,
+            *,
+            sticky_seconds: float = 2.0,
+            max_clients: int = 10000,
+    ):
+        self.primary = primary
+        self.replicas = replicas or []
+        self.sticky_seconds = sticky_seconds
+        self.max_clients = max_clients
+        self._replica_cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._last_write = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_urls(
+            cls,
+            primary_url: str,
+            replica_urls: list[str] | None = None,
+            *,
+            sticky_seconds: float = 2.0,
+            **engine_kwargs
+    ):
+        def _sessionmaker(url):
+            engine = create_engine(url, **engine_kwargs)
+            return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        return cls(
+            _sessionmaker(primary_url),
+            [_sessionmaker(url) for url in replica_urls or []],
+            sticky_seconds=sticky_seconds,
+        )
+
+    def mark_write(self, client_id) -> None:
+        if client_id is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._last_write) >= self.max_clients:
+                self._prune(now)
+            self._last_write[client_id] = now
+
+    def is_sticky(self, client_id) -> bool:
+        if client_id is None:
+            return False
+        last_write = self._last_write.get(client_id)
+        return last_write is not None and time.monotonic() - last_write < self.sticky_seconds
+
+    def get_sessionmaker(self, mode: str, client_id=None) -> sessionmaker:
+        if mode == WRITE or self._replica_cycle is None or self.is_sticky(client_id):
+            return self.primary
+        with self._lock:
+            return next(self._replica_cycle)
+
+    def session(self, mode: str, client_id=None):
+        return self.get_sessionmaker(mode, client_id)()
+
+    def _prune(self, now: float) -> None:
+        expired = [k for k, v in self._last_write.items() if now - v >= self.sticky_seconds]
+        for k in expired:
+            del self._last_write[k]
+        if len(self._last_write) >= self.max_clients:
+            self._last_write.clear()
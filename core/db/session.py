@@ -1,10 +1,17 @@
+import os
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from core.db import routing
+
+DATABASE_URL = os.environ.get("DATABASE_URL", "")
+POOL_OPTIONS = {"pool_size": 50, "max_overflow": 100}
 
 engine = create_engine(
-    "",
+    DATABASE_URL,
     pool_pre_ping=True,
-    pool_size=50,
-    max_overflow=100)
+    **({} if DATABASE_URL.startswith("sqlite") else POOL_OPTIONS))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+router = routing.SessionRouter(SessionLocal)
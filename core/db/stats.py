@@ -0,0 +1,80 @@
+import contextlib
+import contextvars
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+START_KEY = "query_start"
+
+
+class QueryStats:
+    __slots__ = ("count", "duration", "statements", "_lock")
+
+    def __init__(self, capture: bool = False):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = [] if capture else None
+        self._lock = threading.Lock()
+
+    def start_capture(self) -> None:
+        with self._lock:
+            if self.statements is None:
+                self.statements = []
+
+    def record(self, statement: str, duration: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            if self.statements is not None:
+                self.statements.append((statement, duration))
+
+
+_current = contextvars.ContextVar("query_stats", default=None)
+
+
+def get_stats() -> QueryStats | None:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info[START_KEY].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(context):
+    starts = context.connection.info.get(START_KEY) if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def install(target=Engine) -> None:
+    if event.contains(target, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+
+
+@contextlib.contextmanager
+def track(capture: bool = False):
+    stats = _current.get()
+    if stats is not None:
+        if capture:
+            stats.start_capture()
+        yield stats
+        return
+    install()
+    stats = QueryStats(capture)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
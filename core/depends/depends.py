@@ -1,9 +1,39 @@
-from core.db import session
+from fastapi import Request
+
+from core.db import loader, session, routing
+
+CLIENT_ID_HEADER = "x-client-id"
 
 
 def get_db():
     db = session.SessionLocal()
+    loader.attach_loader(db)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_client_id(request: Request):
+    client_id = request.headers.get(CLIENT_ID_HEADER)
+    if client_id:
+        return client_id
+    return request.client.host if request.client else None
+
+
+def get_routed_db(mode: str, router: routing.SessionRouter | None = None):
+    def _get_db(request: Request):
+        _router = router or session.router
+        client_id = get_client_id(request)
+        if mode == routing.WRITE:
+            _router.mark_write(client_id)
+        db = _router.session(mode, client_id)
+        loader.attach_loader(db)
+        try:
+            yield db
+        finally:
+            db.close()
+            if mode == routing.WRITE:
+                _router.mark_write(client_id)
+
+    return _get_db
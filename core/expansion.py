@@ -0,0 +1,79 @@
+import copy
+from collections import defaultdict
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from core import scenario
+from core.helper import db_helper
+
+API_SCENARIO = scenario.APIScenario
+PROJECTION_LAYOUT = scenario.ProjectionLayout
+DB_HELPER = db_helper.DBHelper
+
+
+class APIExpansion:
+    def __init__(
+            self,
+            relation: str,
+            scenario: API_SCENARIO,
+            *,
+            name: str | None = None,
+            scene_name: str = "summary",
+            deleted_key: str = "is_deleted",
+    ):
+        self.relation = relation
+        self.name = name or relation
+        self.scenario = scenario
+        self.scene_name = scene_name
+        self.deleted_key = deleted_key
+        self.layout = None
+        self.connector = None
+        self.local_key = None
+        self.remote_key = None
+        self.uselist = True
+        self.columns = None
+        self.batched = False
+
+    def bind(self, model) -> "APIExpansion":
+        mapper = inspect(model)
+        if self.relation not in mapper.relationships:
+            raise ValueError(f"'{model.__name__}' has no relationship '{self.relation}'")
+        relationship = mapper.relationships[self.relation]
+        if relationship.secondary is not None or len(relationship.local_remote_pairs) != 1:
+            raise ValueError(f"expansion '{self.name}' needs a single-column, direct relationship")
+        if not self.scenario.has_scene(self.scene_name):
+            raise ValueError(f"expansion '{self.name}' scenario has no '{self.scene_name}' scene")
+
+        bound = copy.copy(self)
+        bound.scenario = self.scenario.bind(relationship.mapper.class_)
+        bound.layout = PROJECTION_LAYOUT(self.scene_name, [bound.scenario])
+        (local, remote), = relationship.local_remote_pairs
+        bound.connector = DB_HELPER(relationship.mapper.class_)
+        bound.local_key = mapper.get_property_by_column(local).key
+        bound.remote_key = relationship.mapper.get_property_by_column(remote).key
+        bound.uselist = relationship.uselist
+        bound.columns = None if bound.layout.columns is None else (*bound.layout.columns, bound.remote_key)
+        bound.batched = not bound.uselist and bound.connector.primary_keys == (bound.remote_key,)
+        return bound
+
+    def get_keys(self, entities: list) -> list:
+        return [getattr(entity, self.local_key) for entity in entities]
+
+    def queue(self, db: Session, entities: list) -> None:
+        if self.batched:
+            self.connector.load(db, self.get_keys(entities))
+
+    def load(self, db: Session, entities: list) -> list:
+        keys = self.get_keys(entities)
+        if self.batched:
+            return [None if entity is None else self.layout(entity)
+                    for entity in self.connector.get_many(db, keys, self.deleted_key)]
+        related = self.connector.find_in(db, self.remote_key, {key for key in keys if key is not None},
+                                         deleted_key=self.deleted_key, columns=self.columns)
+        grouped = defaultdict(list)
+        for entity in related:
+            grouped[getattr(entity, self.remote_key)].append(self.layout(entity))
+        if self.uselist:
+            return [grouped.get(key, []) for key in keys]
+        return [grouped[key][0] if grouped.get(key) else None for key in keys]
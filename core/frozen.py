@@ -0,0 +1,34 @@
+import copy
+
+
+def get_slot_names(cls) -> tuple[str, ...]:
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+    return tuple(names)
+
+
+class Frozen:
+    __slots__ = ()
+
+    def _init_slots(self, **values) -> None:
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def _replace(self, **values):
+        clone = copy.copy(self)
+        clone._init_slots(**values)
+        return clone
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"'{type(self).__name__}' is frozen, can't set '{name}'")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"'{type(self).__name__}' is frozen, can't delete '{name}'")
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in get_slot_names(type(self)) if hasattr(self, name)}
+
+    def __setstate__(self, state):
+        self._init_slots(**state)
@@ -1,41 +1,231 @@
 from typing import Type
 
 from fastapi import HTTPException
+from sqlalchemy import delete, func, inspect, lambda_stmt, select, update
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy.orm.session import Session
+from sqlalchemy.sql import Select
+
+from core.db import loader
+
+
+def get_version_key(model) -> str | None:
+    mapper = inspect(model, raiseerr=False)
+    if mapper is None or mapper.version_id_col is None:
+        return None
+    return mapper.get_property_by_column(mapper.version_id_col).key
+
+
+AGGREGATES = {
+    "count": func.count,
+    "sum": func.sum,
+    "avg": func.avg,
+    "min": func.min,
+    "max": func.max,
+}
+
+
+def build_select_statement(model):
+    return lambda_stmt(lambda: select(model))
+
+
+def build_count_statement(model):
+    return lambda_stmt(lambda: select(func.count()).select_from(model))
 
 
 class DBHelper:
     def __init__(self, model: Type[any]):
         self.model = model
+        self.select_statement = build_select_statement(model)
+        self.count_statement = build_count_statement(model)
+        self.version_key = get_version_key(model)
+        mapper = inspect(model)
+        self.column_keys = frozenset(prop.key for prop in mapper.column_attrs)
+        self.primary_keys = tuple(mapper.get_property_by_column(column).key for column in mapper.primary_key)
+
+    def get_load_options(self, columns: tuple[str, ...] | None, deleted_key: str = "is_deleted") -> list:
+        if columns is None:
+            return []
+        keys = {*self.primary_keys, *(key for key in columns if key in self.column_keys)}
+        for key in (deleted_key, self.version_key):
+            if key in self.column_keys:
+                keys.add(key)
+        return [load_only(*[getattr(self.model, key) for key in sorted(keys)])]
 
-    def get(self, db: Session, entity_id, allow_deleted: bool = False, deleted_key: str = "is_deleted"):
-        entity = db.query(self.model).get(entity_id)
+    def get(self, db: Session, entity_id, allow_deleted: bool = False, deleted_key: str = "is_deleted",
+            columns: tuple[str, ...] | None = None):
+        if columns is None and len(self.primary_keys) == 1:
+            entity = loader.get_loader(db).get(self.model, entity_id)
+        else:
+            entity = db.get(self.model, entity_id, options=self.get_load_options(columns, deleted_key))
         if entity is None:
             raise HTTPException(status_code=404, detail="Entity not found")
-        elif hasattr(entity, deleted_key) and not allow_deleted and entity.is_deleted:
+        elif hasattr(entity, deleted_key) and not allow_deleted and getattr(entity, deleted_key):
             raise HTTPException(status_code=404, detail="Entity not found")
         return entity
 
-    def find_query(self, db: Session, filter_args: list[any] = None, sort: list[any] = None):
-        query = db.query(self.model)
+    def load(self, db: Session, entity_ids) -> None:
+        loader.get_loader(db).load_many(self.model, entity_ids)
+
+    def defer(self, db: Session, entity_id) -> loader.Deferred:
+        return loader.get_loader(db).defer(self.model, entity_id)
+
+    def get_many(self, db: Session, entity_ids, deleted_key: str = "is_deleted") -> list:
+        entities = loader.get_loader(db).get_many(self.model, entity_ids)
+        return [None if entity is None or getattr(entity, deleted_key, False) else entity for entity in entities]
+
+    def join_match(self, statement: Select, match) -> Select:
+        if match is None:
+            return statement
+        matches, _ = match
+        return statement.join(matches, matches.c.id == getattr(self.model, self.primary_keys[0]))
+
+    def find_query(self, db: Session, filter_args: list[any] = None, sort: list[any] = None, match=None) -> Select:
+        statement = self.join_match(select(self.model), match)
+        if match is not None:
+            sort = [match[1], *(sort or [])]
+        if filter_args:
+            statement = statement.where(*filter_args)
+        if sort:
+            statement = statement.order_by(*sort)
+        return statement
+
+    def find_in(self, db: Session, key: str, values, deleted_key: str = "is_deleted",
+                columns: tuple[str, ...] | None = None):
+        if not values:
+            return []
+        statement = select(self.model).where(getattr(self.model, key).in_(values))
+        statement = statement.options(*self.get_load_options(columns, deleted_key))
+        if deleted_key in self.column_keys:
+            statement = statement.where(getattr(self.model, deleted_key).is_not(True))
+        return db.execute(statement).scalars().all()
+
+    def count_query(self, db: Session, filter_args: list[any] = None, match=None) -> Select:
+        statement = self.join_match(select(func.count()).select_from(self.model), match)
         if filter_args:
-            return query.filter(*filter_args).order_by(*sort)
-        return query
+            statement = statement.where(*filter_args)
+        return statement
 
     def find_and_count(self, db: Session,
                        filter_args: list[any] = None, sort: list[any] = None,
-                       offset: int = 0, limit: int = 10):
-        query = self.find_query(db, filter_args, sort)
-        return query.offset(offset).limit(limit).all(), query.count()
+                       offset: int = 0, limit: int = 10, columns: tuple[str, ...] | None = None, match=None):
+        if filter_args or sort or columns is not None or match is not None:
+            statement = self.find_query(db, filter_args, sort, match).offset(offset).limit(limit)
+            statement = statement.options(*self.get_load_options(columns))
+            count_statement = self.count_query(db, filter_args, match)
+        else:
+            statement = self.select_statement + (lambda s: s.offset(offset).limit(limit))
+            count_statement = self.count_statement
+        return db.execute(statement).scalars().all(), db.execute(count_statement).scalar_one()
+
+    def check_version(self, entity, expected: str | None):
+        if expected is None or self.version_key is None or expected.strip() == "*":
+            return
+        if expected.strip().removeprefix("W/").strip('"') != str(getattr(entity, self.version_key)):
+            raise HTTPException(status_code=412, detail="Entity version does not match")
+
+    def is_collection(self, relation: str | None) -> bool:
+        relationships = inspect(self.model).relationships
+        return relation in relationships and relationships[relation].uselist
+
+    def reconcile_children(self, db: Session, entity, relation: str, rows: list[dict],
+                           deleted_key: str = "is_deleted", loc: tuple | None = None):
+        relationship = inspect(self.model).relationships[relation]
+        child_mapper = relationship.mapper
+        child = child_mapper.class_
+        columns = {prop.key: prop.columns[0] for prop in child_mapper.column_attrs}
+        pk_key = child_mapper.get_property_by_column(child_mapper.primary_key[0]).key
+        parent_keys = {
+            child_mapper.get_property_by_column(remote).key:
+                getattr(entity, inspect(self.model).get_property_by_column(local).key)
+            for local, remote in relationship.local_remote_pairs
+        }
+
+        statement = select(*[column.label(key) for key, column in columns.items()]).where(
+            *[columns[key] == value for key, value in parent_keys.items()]
+        )
+        if deleted_key in columns:
+            statement = statement.where(columns[deleted_key].is_not(True))
+        existing = {row[pk_key]: row for row in db.execute(statement).mappings()}
+
+        inserts, updates, kept, unknown = [], [], set(), []
+        for index, row in enumerate(rows):
+            row = {k: v for k, v in row.items() if k in columns}
+            child_id = row.pop(pk_key, None)
+            if child_id is None:
+                inserts.append({**row, **parent_keys})
+                continue
+            current = existing.get(child_id)
+            if current is None:
+                unknown.append({
+                    "loc": [*(loc or ("body", relation)), index, pk_key],
+                    "msg": f"'{child.__name__}' {child_id} is not in '{relation}'",
+                    "type": "value_error.unknown_child",
+                })
+                continue
+            kept.add(child_id)
+            changed = {k: v for k, v in row.items() if current[k] != v}
+            if changed:
+                updates.append({pk_key: child_id, **changed})
+
+        if unknown:
+            raise HTTPException(status_code=422, detail=unknown)
+
+        removed = [child_id for child_id in existing if child_id not in kept]
+        if inserts:
+            db.bulk_insert_mappings(child, inserts)
+        if updates:
+            db.bulk_update_mappings(child, updates)
+        if removed and deleted_key in columns:
+            db.execute(
+                update(child).where(columns[pk_key].in_(removed)).values({deleted_key: True})
+                .execution_options(synchronize_session=False)
+            )
+        elif removed:
+            db.execute(
+                delete(child).where(columns[pk_key].in_(removed))
+                .execution_options(synchronize_session=False)
+            )
+        db.expire(entity, [relation])
+
+    def aggregate(self, db: Session, group_by: list[tuple[str, str]], metrics: list[tuple[str, str, str | None]],
+                  filter_args: list[any] = None) -> list[dict]:
+        group_columns = [getattr(self.model, attr) for _, attr in group_by]
+        labeled_group_columns = [column.label(label) for column, (label, _) in zip(group_columns, group_by)]
+        metric_columns = [
+            (AGGREGATES[fn](getattr(self.model, attr)) if attr else AGGREGATES[fn]()).label(label)
+            for label, fn, attr in metrics
+        ]
+        statement = select(*labeled_group_columns, *metric_columns).select_from(self.model)
+        if filter_args:
+            statement = statement.where(*filter_args)
+        if group_columns:
+            statement = statement.group_by(*group_columns).order_by(*group_columns)
+        return [dict(row) for row in db.execute(statement).mappings()]
 
     def create_entity(self):
         return self.model()
 
+    def get_insert_mapping(self, entity) -> dict:
+        state = inspect(entity)
+        row = {key: value for key, value in state.dict.items() if key in self.column_keys}
+        if self.version_key is not None:
+            row.setdefault(self.version_key, 1)
+        return row
+
+    def bulk_insert(self, db: Session, rows: list[dict]):
+        db.bulk_insert_mappings(self.model, rows)
+
     def apply_commit_refresh(self, db: Session, entity):
         self.apply(db, entity)
         self.commit(db)
         self.refresh(db, entity)
 
+    @staticmethod
+    def has_pending_changes(db: Session) -> bool:
+        return bool(db.new or db.dirty or db.deleted)
+
     @staticmethod
     def apply(db: Session, entity):
         db.add(entity)
@@ -44,12 +234,22 @@ class DBHelper:
     def apply_all(db: Session, entities):
         db.add_all(entities)
 
+    @staticmethod
+    def flush(db: Session):
+        db.flush()
+
     @staticmethod
     def commit(db: Session):
-        db.commit()
+        loader.clear_loader(db)
+        try:
+            db.commit()
+        except StaleDataError:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Entity was modified concurrently")
 
     @staticmethod
     def rollback(db: Session):
+        loader.clear_loader(db)
         db.rollback()
 
     @staticmethod
@@ -0,0 +1,84 @@
+import operator
+
+from fastapi import HTTPException
+
+TERM_SEPARATOR = ","
+PART_SEPARATOR = ":"
+VALUE_SEPARATOR = "|"
+
+OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "in": lambda column, value: column.in_(value),
+    "like": lambda column, value: column.like(value),
+}
+LIST_OPERATORS = {"in"}
+TRUE_VALUES = {"true", "1", "yes"}
+FALSE_VALUES = {"false", "0", "no"}
+
+
+def bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=400, detail=detail)
+
+
+def get_python_type(column) -> type | None:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def convert_value(column, value: str):
+    if value == "null":
+        return None
+    typ = get_python_type(column)
+    if typ is bool:
+        lowered = value.lower()
+        if lowered in TRUE_VALUES:
+            return True
+        if lowered in FALSE_VALUES:
+            return False
+        raise bad_request(f"'{value}' is not a boolean")
+    if typ in (int, float):
+        try:
+            return typ(value)
+        except ValueError:
+            raise bad_request(f"'{value}' is not a valid {typ.__name__}")
+    return value
+
+
+class FilterCompiler:
+    def __init__(self, model, fields: dict[str, str]):
+        self.model = model
+        self.fields = fields
+
+    def get_column(self, name: str):
+        attr = self.fields.get(name)
+        if attr is None:
+            raise bad_request(f"'{name}' is not a model field")
+        return getattr(self.model, attr)
+
+    def compile_term(self, term: str):
+        parts = term.split(PART_SEPARATOR, 2)
+        if len(parts) != 3:
+            raise bad_request(f"filter '{term}' must be 'field:op:value'")
+        name, op, value = parts
+        if op not in OPERATORS:
+            raise bad_request(f"unknown filter operator '{op}'")
+        column = self.get_column(name)
+        if op in LIST_OPERATORS:
+            value = [convert_value(column, v) for v in value.split(VALUE_SEPARATOR)]
+        elif value == "null" and op in ("eq", "ne"):
+            return column.is_(None) if op == "eq" else column.is_not(None)
+        else:
+            value = convert_value(column, value)
+        return OPERATORS[op](column, value)
+
+    def __call__(self, expression: str | None) -> list:
+        if not expression:
+            return []
+        return [self.compile_term(term) for term in expression.split(TERM_SEPARATOR) if term]
@@ -0,0 +1,35 @@
+from sqlalchemy import inspect
+
+from core.frozen import Frozen
+
+
+class ColumnInfo(Frozen):
+    __slots__ = ("key", "typ", "nullable", "max_length")
+
+    def __init__(self, key: str, typ: type | None, nullable: bool, max_length: int | None):
+        self._init_slots(key=key, typ=typ, nullable=nullable, max_length=max_length)
+
+
+def get_python_type(typ) -> type | None:
+    try:
+        return typ.python_type
+    except NotImplementedError:
+        impl = getattr(typ, "impl", None)
+        return get_python_type(impl) if impl is not None else None
+
+
+def get_column_info(model, name: str) -> ColumnInfo | None:
+    mapper = inspect(model)
+    if name not in mapper.all_orm_descriptors and not hasattr(model, name):
+        raise ValueError(f"'{model.__name__}' has no attribute '{name}'")
+    if name not in mapper.column_attrs:
+        return None
+    column = mapper.column_attrs[name].columns[0]
+    return ColumnInfo(name, get_python_type(column.type), bool(column.nullable), getattr(column.type, "length", None))
+
+
+def get_related_model(model, relation: str):
+    mapper = inspect(model)
+    if relation not in mapper.relationships:
+        raise ValueError(f"'{model.__name__}' has no relationship '{relation}'")
+    return mapper.relationships[relation].mapper.class_
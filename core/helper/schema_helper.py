@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import create_model
 
 
@@ -71,14 +73,14 @@ class JsonSchemaHelper(APISchemaHelperBase):
             schema_helper = self.nested_list_field[name]
         else:
             schema_helper = JsonSchemaHelper()
-        schema_helper.add_field(fields)
+        schema_helper.add_fields(fields)
         self.nested_list_field[name] = schema_helper
 
     def get_schemas(self, model_name):
         for name, schema_helper in self.nested_field.items():
             self.fields[name] = (schema_helper.get_schemas(name), ...)
         for name, schema_helper in self.nested_list_field.items():
-            self.fields[name] = (list[schema_helper.get_schemas(f"{model_name}_{name}")], ...)
+            self.fields[name] = (Optional[list[schema_helper.get_schemas(f"{model_name}_{name}")]], None)
         return create_model(model_name, **self.fields)
 
 
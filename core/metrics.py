@@ -0,0 +1,232 @@
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
+
+from core.db import stats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 10000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+REQUESTS = "scenario_requests_total"
+LATENCY = "scenario_request_duration_seconds"
+ROWS = "scenario_rows_returned"
+DB_QUERIES = "scenario_db_queries_total"
+DB_TIME = "scenario_db_duration_seconds"
+CACHE = "scenario_cache_requests_total"
+PAYLOAD = "scenario_response_bytes"
+
+COUNTERS = {
+    REQUESTS: "Requests handled, by chapter, endpoint and status.",
+    DB_QUERIES: "SQL statements executed while handling requests.",
+    CACHE: "Cache lookups, by chapter, cache and result.",
+}
+HISTOGRAMS = {
+    LATENCY: "Request handling time in seconds.",
+    ROWS: "Rows loaded per request.",
+    DB_TIME: "Time spent in SQL statements per request, in seconds.",
+    PAYLOAD: "Response body bytes sent, after content encoding.",
+}
+
+
+class RequestSample:
+    __slots__ = ("chapter", "endpoint", "status", "rows", "cache")
+
+    def __init__(self, chapter: str, endpoint: str):
+        self.chapter = chapter
+        self.endpoint = endpoint
+        self.status = 200
+        self.rows = None
+        self.cache = []
+
+    def respond(self, response) -> None:
+        if isinstance(response, Response):
+            self.status = response.status_code
+
+    @property
+    def labels(self) -> tuple[tuple[str, str], ...]:
+        return ("chapter", self.chapter), ("endpoint", self.endpoint)
+
+
+_sample = contextvars.ContextVar("request_sample", default=None)
+
+
+def record_rows(count: int) -> None:
+    sample = _sample.get()
+    if sample is not None:
+        sample.rows = count if sample.rows is None else sample.rows + count
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    sample = _sample.get()
+    if sample is not None:
+        sample.cache.append((cache, hit))
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    return ",".join(f'{name}="{escape_label(value)}"' for name, value in labels)
+
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Shard:
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+
+class ResponseSizeMiddleware:
+    def __init__(self, app, registry: "MetricsRegistry"):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        labels = []
+        size = 0
+
+        async def _send(message):
+            nonlocal size
+            if message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        token = self.registry.response_labels.set(labels)
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            self.registry.response_labels.reset(token)
+            if labels:
+                self.registry.observe(PAYLOAD, labels[-1], size)
+
+
+class MetricsRegistry:
+    def __init__(
+            self,
+            *,
+            path: str = "/metrics",
+            latency_buckets: tuple[float, ...] = LATENCY_BUCKETS,
+            row_buckets: tuple[float, ...] = ROW_BUCKETS,
+            size_buckets: tuple[float, ...] = SIZE_BUCKETS,
+    ):
+        self.path = path
+        self.buckets = {LATENCY: latency_buckets, ROWS: row_buckets, DB_TIME: latency_buckets, PAYLOAD: size_buckets}
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+        self.response_labels = contextvars.ContextVar(f"response_labels_{id(self)}", default=None)
+
+    def _get_shard(self) -> Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name: str, labels: tuple, value: float = 1) -> None:
+        counters = self._get_shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: tuple, value: float) -> None:
+        histograms = self._get_shard().histograms
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = [0] * (len(self.buckets[name]) + 2)
+        histogram[bisect.bisect_left(self.buckets[name], value)] += 1
+        histogram[-1] += value
+
+    def record(self, sample: RequestSample, duration: float, query_stats: stats.QueryStats) -> None:
+        labels = sample.labels
+        self.inc(REQUESTS, labels + (("status", sample.status),))
+        self.observe(LATENCY, labels, duration)
+        self.inc(DB_QUERIES, labels, query_stats.count)
+        self.observe(DB_TIME, labels, query_stats.duration)
+        if sample.rows is not None:
+            self.observe(ROWS, labels, sample.rows)
+        for cache, hit in sample.cache:
+            self.inc(CACHE, (("chapter", sample.chapter), ("cache", cache), ("result", "hit" if hit else "miss")))
+
+    @contextlib.contextmanager
+    def track(self, chapter: str, endpoint: str):
+        sample = RequestSample(chapter, endpoint)
+        response_labels = self.response_labels.get()
+        if response_labels is not None:
+            response_labels.append(sample.labels)
+        token = _sample.set(sample)
+        started = time.perf_counter()
+        with stats.track() as query_stats:
+            try:
+                yield sample
+            except HTTPException as e:
+                sample.status = e.status_code
+                raise
+            except Exception:
+                sample.status = 500
+                raise
+            finally:
+                _sample.reset(token)
+                self.record(sample, time.perf_counter() - started, query_stats)
+
+    def collect(self) -> tuple[dict, dict]:
+        with self._lock:
+            shards = list(self._shards)
+        counters, histograms = {}, {}
+        for shard in shards:
+            for key, value in shard.counters.copy().items():
+                counters[key] = counters.get(key, 0) + value
+            for key, histogram in shard.histograms.copy().items():
+                merged = histograms.setdefault(key, [0] * len(histogram))
+                for index, value in enumerate(list(histogram)):
+                    merged[index] += value
+        return counters, histograms
+
+    def render(self) -> str:
+        counters, histograms = self.collect()
+        lines = []
+        for name, description in COUNTERS.items():
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+            for (key, labels), value in sorted(counters.items()):
+                if key == name:
+                    lines.append(f"{name}{{{format_labels(labels)}}} {format_value(value)}")
+        for name, description in HISTOGRAMS.items():
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+            bounds = [format_value(bound) for bound in self.buckets[name]] + ["+Inf"]
+            for (key, labels), histogram in sorted(histograms.items()):
+                if key != name:
+                    continue
+                label_text = format_labels(labels)
+                cumulative = 0
+                for bound, count in zip(bounds, histogram[:-1]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{label_text}}} {format_value(histogram[-1])}")
+                lines.append(f"{name}_count{{{label_text}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, request: Request) -> Response:
+        return Response(self.render(), media_type=CONTENT_TYPE)
+
+    def install(self, app: FastAPI) -> "MetricsRegistry":
+        app.add_route(self.path, self.serve, include_in_schema=False)
+        app.add_middleware(ResponseSizeMiddleware, registry=self)
+        return self
@@ -0,0 +1,107 @@
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from core import actor_role
+from core.frozen import Frozen
+
+ROLE_TYPE = actor_role.BaseActorRole
+
+WORKER_PLAN_CACHE_SIZE = 64
+
+_worker_plans = {}
+
+
+class ScenePlan(Frozen):
+    __slots__ = ("func", "main_roles", "sub_roles")
+
+    def __init__(self, func, main_roles: tuple[ROLE_TYPE, ...], sub_roles: tuple[ROLE_TYPE, ...]):
+        self._init_slots(func=func, main_roles=main_roles, sub_roles=sub_roles)
+
+    def __call__(self, data, req, extra):
+        return self.func(self.main_roles, self.sub_roles, data, req, extra)
+
+    def dumps(self) -> bytes:
+        try:
+            return pickle.dumps(self, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise ValueError(f"cpu-bound scene plan is not picklable: {e}") from e
+
+
+def load_plan(payload: bytes) -> ScenePlan:
+    plan = _worker_plans.get(payload)
+    if plan is None:
+        if len(_worker_plans) >= WORKER_PLAN_CACHE_SIZE:
+            _worker_plans.clear()
+        plan = _worker_plans[payload] = pickle.loads(payload)
+    return plan
+
+
+def run_plan(payload: bytes, data, req, extra):
+    return load_plan(payload)(data, req, extra)
+
+
+def run_plan_chunk(payload: bytes, chunk: list, req, extra) -> list:
+    plan = load_plan(payload)
+    return [plan(data, req, extra) for data in chunk]
+
+
+def split_chunks(data: list, chunk_size: int) -> list[list]:
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+class ProcessOffload:
+    def __init__(self, max_workers: int | None = None, *, chunk_size: int = 64, inline_below: int = 0):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.inline_below = inline_below
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(self.max_workers)
+        return self._executor
+
+    def is_inline(self, count: int) -> bool:
+        return count < self.inline_below
+
+    def call(self, plan: ScenePlan, payload: bytes, data, req, extra):
+        if self.is_inline(1):
+            return plan(data, req, extra)
+        return self.executor.submit(run_plan, payload, data, req, extra).result()
+
+    def map(self, plan: ScenePlan, payload: bytes, data: list, req, extra) -> list:
+        if self.is_inline(len(data)):
+            return [plan(d, req, extra) for d in data]
+        chunks = split_chunks(data, self.chunk_size)
+        results = []
+        for chunk in self.executor.map(run_plan_chunk, [payload] * len(chunks), chunks,
+                                       [req] * len(chunks), [extra] * len(chunks)):
+            results.extend(chunk)
+        return results
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait)
+
+
+_default_offload = None
+_default_lock = threading.Lock()
+
+
+def get_default_offload() -> ProcessOffload:
+    global _default_offload
+    if _default_offload is None:
+        with _default_lock:
+            if _default_offload is None:
+                _default_offload = ProcessOffload()
+    return _default_offload
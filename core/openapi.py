@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import json
+import threading
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import Response
+
+from core import chapter
+
+API_CHAPTER = chapter.APIChapter
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def get_route_keys(routes) -> set[tuple[str, str]]:
+    return {
+        (route.path, method)
+        for route in routes
+        for method in getattr(route, "methods", None) or ()
+    }
+
+
+def merge_fragment(document: dict, fragment: dict) -> dict:
+    document.setdefault("paths", {})
+    for path, operations in fragment.get("paths", {}).items():
+        document["paths"].setdefault(path, {}).update(operations)
+    for section, components in fragment.get("components", {}).items():
+        document.setdefault("components", {}).setdefault(section, {}).update(components)
+    return document
+
+
+def accepts_gzip(request: Request) -> bool:
+    return any(
+        encoding.split(";")[0].strip() == "gzip"
+        for encoding in request.headers.get("accept-encoding", "").split(",")
+    )
+
+
+class OpenAPIDocument:
+    def __init__(self, app: FastAPI, chapters: list[API_CHAPTER], *, compresslevel: int = 9):
+        self.app = app
+        self.chapters = chapters
+        self.compresslevel = compresslevel
+        self.schema = None
+        self.body = None
+        self.gzip_body = None
+        self.etag = None
+        self._lock = threading.Lock()
+
+    def get_info(self, routes) -> dict:
+        app = self.app
+        # summary and webhooks only exist on FastAPI >= 0.99
+        extra = {}
+        if getattr(app, "summary", None):
+            extra["summary"] = app.summary
+        if getattr(app, "webhooks", None) is not None:
+            extra["webhooks"] = app.webhooks.routes
+        return get_openapi(
+            title=app.title,
+            version=app.version,
+            openapi_version=app.openapi_version,
+            description=app.description,
+            terms_of_service=app.terms_of_service,
+            contact=app.contact,
+            license_info=app.license_info,
+            routes=routes,
+            tags=app.openapi_tags,
+            servers=app.servers,
+            **extra,
+        )
+
+    def build(self) -> dict:
+        chapter_keys = set()
+        fragments = []
+        for _chapter in self.chapters:
+            chapter_keys |= get_route_keys(_chapter.route.routes)
+            fragments.append(_chapter.openapi_fragment())
+        routes = [route for route in self.app.routes if not get_route_keys([route]) & chapter_keys]
+        schema = self.get_info(routes)
+        for fragment in fragments:
+            merge_fragment(schema, fragment)
+        self.load(jsonable_encoder(schema, by_alias=True, exclude_none=True))
+        return self.schema
+
+    def get_schema(self) -> dict:
+        if self.schema is None:
+            with self._lock:
+                if self.schema is None and self.app.openapi_schema is not None:
+                    self.load(self.app.openapi_schema)
+                elif self.schema is None:
+                    self.build()
+        return self.schema
+
+    def install(self) -> "OpenAPIDocument":
+        app = self.app
+        app.openapi = self.get_schema
+        if app.openapi_url:
+            app.router.routes = [
+                route for route in app.router.routes if getattr(route, "path", None) != app.openapi_url
+            ]
+            app.add_route(app.openapi_url, self.serve, include_in_schema=False)
+        return self
+
+    def load(self, schema: dict) -> None:
+        body = json.dumps(schema, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        self.gzip_body = gzip.compress(body, self.compresslevel, mtime=0)
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.body = body
+        self.schema = schema
+
+    async def serve(self, request: Request) -> Response:
+        self.get_schema()
+        headers = {"ETag": self.etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+        if self.etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+            return Response(status_code=304, headers=headers)
+        if accepts_gzip(request):
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzip_body, media_type=JSON_MEDIA_TYPE, headers=headers)
+        return Response(self.body, media_type=JSON_MEDIA_TYPE, headers=headers)
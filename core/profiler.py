@@ -0,0 +1,155 @@
+import collections
+import contextlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+from core.db import stats
+
+logger = logging.getLogger(__name__)
+
+UNSAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def get_file_name(value: str) -> str:
+    return UNSAFE_NAME.sub("_", value).strip(".") or "_"
+
+
+def get_stack(frame) -> tuple[str, ...]:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_filename}:{frame.f_lineno}:{code.co_name}")
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+class ActiveRequest:
+    __slots__ = ("chapter", "scene", "ident", "started", "deadline", "sampling", "samples", "query_stats")
+
+    def __init__(self, chapter: str, scene: str, threshold: float, query_stats: stats.QueryStats):
+        self.chapter = chapter
+        self.scene = scene
+        self.ident = threading.get_ident()
+        self.started = time.perf_counter()
+        self.deadline = self.started + threshold
+        self.sampling = None
+        self.samples = collections.Counter()
+        self.query_stats = query_stats
+
+
+class SlowRequestProfiler:
+    def __init__(
+            self,
+            directory: str,
+            *,
+            threshold: float = 1.0,
+            interval: float = 0.005,
+            cooldown: float = 60.0,
+            max_files: int = 100,
+            scenes: frozenset[str] | None = None,
+    ):
+        if interval <= 0 or threshold < 0:
+            raise ValueError("profiler interval must be positive and threshold non-negative")
+        self.directory = directory
+        self.threshold = threshold
+        self.interval = interval
+        self.cooldown = cooldown
+        self.max_files = max_files
+        self.scenes = scenes
+        self._active = {}
+        self._next_capture = 0.0
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._watch, name="slow-request-profiler", daemon=True)
+                self._thread.start()
+
+    def _allow(self, now: float) -> bool:
+        with self._lock:
+            if now < self._next_capture:
+                return False
+            self._next_capture = now + self.cooldown
+            return True
+
+    def _watch(self) -> None:
+        while True:
+            if not self._active:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            frames = None
+            for active in list(self._active.values()):
+                if now < active.deadline:
+                    continue
+                if active.sampling is None:
+                    active.sampling = self._allow(now)
+                    if active.sampling:
+                        active.query_stats.start_capture()
+                if not active.sampling:
+                    continue
+                if frames is None:
+                    frames = sys._current_frames()
+                frame = frames.get(active.ident)
+                if frame is not None:
+                    active.samples[get_stack(frame)] += 1
+
+    def write(self, active: ActiveRequest, duration: float) -> str:
+        query_stats = active.query_stats
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{time.time_ns()}-{get_file_name(active.chapter)}-{get_file_name(active.scene)}.json"
+        path = os.path.join(self.directory, name)
+        report = {
+            "chapter": active.chapter,
+            "scene": active.scene,
+            "duration": duration,
+            "threshold": self.threshold,
+            "interval": self.interval,
+            "queries": query_stats.count,
+            "db_duration": query_stats.duration,
+            "sql": [{"statement": statement, "duration": elapsed}
+                    for statement, elapsed in query_stats.statements or ()],
+            "samples": [{"count": count, "stack": list(stack)} for stack, count in active.samples.most_common()],
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=1)
+        self.rotate()
+        return path
+
+    def rotate(self) -> None:
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(".json"))
+        for name in names[:max(0, len(names) - self.max_files)]:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(self.directory, name))
+
+    @contextlib.contextmanager
+    def track(self, chapter: str, scene: str):
+        if self.scenes is not None and scene not in self.scenes:
+            yield None
+            return
+        self._start()
+        # SQL text is only kept once the watcher starts sampling, so fast requests just count queries.
+        with stats.track() as query_stats:
+            active = ActiveRequest(chapter, scene, self.threshold, query_stats)
+            key = id(active)
+            self._active[key] = active
+            self._wake.set()
+            try:
+                yield active
+            finally:
+                del self._active[key]
+                if active.sampling:
+                    try:
+                        self.write(active, time.perf_counter() - active.started)
+                    except OSError as e:
+                        logger.warning("cannot write slow request profile to %s: %s", self.directory, e)
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+
+from core.request.projection import split_names
+
+METRIC_SEPARATOR = ":"
+
+
+class AggregateParams(BaseModel):
+    group_by: str | None = Field(default="")
+    metrics: str | None = Field(default="count")
+    filter: str | None = Field(default="")
+
+    def get_group_by(self) -> tuple[str, ...]:
+        return tuple(sorted(split_names(self.group_by) or ()))
+
+    def get_metrics(self) -> tuple[tuple[str, str | None], ...]:
+        metrics = []
+        for metric in sorted(split_names(self.metrics) or ()):
+            fn, _, name = metric.partition(METRIC_SEPARATOR)
+            metrics.append((fn, name or None))
+        return tuple(metrics)
+
+    def get_filter_params(self):
+        return self.filter
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+
+class ExportParams(BaseModel):
+    q: str | None = Field(default="")
+    filter: str | None = Field(default="")
+
+    def get_search_params(self):
+        return self.q
+
+    def get_filter_params(self):
+        return self.filter
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+
+
+def split_names(value: str | None) -> frozenset[str] | None:
+    if not value:
+        return None
+    names = frozenset(name.strip() for name in value.split(",") if name.strip())
+    return names or None
+
+
+class ProjectionParams(BaseModel):
+    fields: str | None = Field(default="")
+    expand: str | None = Field(default="")
+
+    def get_fields(self) -> frozenset[str] | None:
+        return split_names(self.fields)
+
+    def get_expand(self) -> frozenset[str]:
+        return split_names(self.expand) or frozenset()
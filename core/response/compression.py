@@ -0,0 +1,120 @@
+import gzip
+import json
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP = "gzip"
+BROTLI = "br"
+ZSTD = "zstd"
+JSON_MEDIA_TYPE = "application/json"
+
+DEFAULT_LEVELS = {GZIP: 6, BROTLI: 5, ZSTD: 3}
+
+
+def compress_gzip(body: bytes, level: int) -> bytes:
+    return gzip.compress(body, level, mtime=0)
+
+
+def compress_brotli(body: bytes, level: int) -> bytes:
+    return brotli.compress(body, quality=level)
+
+
+def compress_zstd(body: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+ENCODERS = {GZIP: compress_gzip}
+if brotli is not None:
+    ENCODERS[BROTLI] = compress_brotli
+if zstandard is not None:
+    ENCODERS[ZSTD] = compress_zstd
+
+
+def parse_quality_values(header: str) -> dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        encoding, _, params = part.strip().partition(";")
+        if not encoding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[encoding.strip().lower()] = quality
+    return accepted
+
+
+def render_json(content, model=None) -> bytes:
+    if model:
+        content = model.parse_obj(content)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class EncodedBody:
+    __slots__ = ("raw", "media_type", "encoded")
+
+    def __init__(self, raw: bytes, media_type: str = JSON_MEDIA_TYPE):
+        self.raw = raw
+        self.media_type = media_type
+        self.encoded = {}
+
+
+class CompressionPolicy:
+    def __init__(
+            self,
+            *,
+            min_size: int = 1024,
+            encodings: tuple[str, ...] = (ZSTD, BROTLI, GZIP),
+            levels: dict[str, int] | None = None,
+    ):
+        unknown = [encoding for encoding in encodings if encoding not in DEFAULT_LEVELS]
+        if unknown:
+            raise ValueError(f"unknown encodings: {', '.join(unknown)}")
+        self.min_size = min_size
+        self.encodings = tuple(encoding for encoding in encodings if encoding in ENCODERS)
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+
+    def choose(self, request: Request, size: int) -> str | None:
+        if size < self.min_size or not self.encodings:
+            return None
+        accepted = parse_quality_values(request.headers.get("accept-encoding", ""))
+        wildcard = accepted.get("*", 0.0)
+        for encoding in self.encodings:
+            if accepted.get(encoding, wildcard) > 0:
+                return encoding
+        return None
+
+    def encode(self, body: EncodedBody, encoding: str) -> bytes:
+        encoded = body.encoded.get(encoding)
+        if encoded is None:
+            encoded = body.encoded[encoding] = ENCODERS[encoding](body.raw, self.levels[encoding])
+        return encoded
+
+    def respond(self, request: Request, body: EncodedBody, status_code: int = 200) -> Response:
+        headers = {"Vary": "Accept-Encoding"} if self.encodings else {}
+        encoding = self.choose(request, len(body.raw))
+        if encoding is None:
+            return Response(body.raw, status_code=status_code, media_type=body.media_type, headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(self.encode(body, encoding), status_code=status_code, media_type=body.media_type,
+                        headers=headers)
+
+
+IDENTITY = CompressionPolicy(encodings=())
@@ -0,0 +1,97 @@
+import datetime
+import typing
+
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+
+from core.response import compression
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+ARROW = "arrow"
+
+MEDIA_TYPES = {
+    JSON: "application/json",
+    MSGPACK: "application/msgpack",
+    ARROW: "application/vnd.apache.arrow.stream",
+}
+ACCEPTED_MEDIA_TYPES = {
+    "application/json": JSON,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    "application/vnd.apache.arrow.stream": ARROW,
+    "application/*": JSON,
+    "*/*": JSON,
+}
+
+AVAILABLE = frozenset(name for name, module in ((JSON, True), (MSGPACK, msgpack), (ARROW, pyarrow)) if module)
+ROW_FORMATS = AVAILABLE - {ARROW}
+
+
+def negotiate(request: Request, formats: frozenset[str] = AVAILABLE) -> str:
+    header = request.headers.get("accept", "")
+    if not header:
+        return JSON
+    accepted = compression.parse_quality_values(header)
+    ranked = sorted(accepted.items(), key=lambda item: -item[1])
+    for media_type, quality in ranked:
+        name = ACCEPTED_MEDIA_TYPES.get(media_type)
+        if quality > 0 and name in formats:
+            return name
+    if not any(media_type in ACCEPTED_MEDIA_TYPES for media_type in accepted):
+        return JSON
+    supported = ", ".join(MEDIA_TYPES[name] for name in sorted(formats))
+    raise HTTPException(status_code=406, detail=f"supported media types: {supported}")
+
+
+def render_msgpack(content, model=None) -> bytes:
+    if model:
+        content = model.parse_obj(content)
+    return msgpack.packb(jsonable_encoder(content))
+
+
+RENDERERS = {JSON: compression.render_json, MSGPACK: render_msgpack}
+
+
+def rows_to_columns(rows: list[dict]) -> dict[str, list]:
+    keys = dict.fromkeys(key for row in rows for key in row)
+    return {key: [row.get(key) for row in rows] for key in keys}
+
+
+def get_arrow_type(typ):
+    if typ is None:
+        return None
+    args = [arg for arg in typing.get_args(typ) if arg is not type(None)]
+    if len(args) == 1:
+        typ = args[0]
+    return {
+        bool: pyarrow.bool_(),
+        int: pyarrow.int64(),
+        float: pyarrow.float64(),
+        str: pyarrow.string(),
+        bytes: pyarrow.binary(),
+        datetime.datetime: pyarrow.timestamp("us"),
+        datetime.date: pyarrow.date32(),
+    }.get(typ)
+
+
+def render_arrow(columns: dict[str, list], types: dict[str, type], metadata: dict[str, any] | None = None) -> bytes:
+    arrays = {name: pyarrow.array(values, type=get_arrow_type(types.get(name))) for name, values in columns.items()}
+    table = pyarrow.table(arrays)
+    if metadata:
+        table = table.replace_schema_metadata({str(k): str(v) for k, v in metadata.items()})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
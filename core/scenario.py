@@ -1,9 +1,25 @@
-from core import scene, actor, actor_role
+import copy
+import inspect
+
+from core import concurrency, scene, actor, actor_role, offload, validation
+from core.helper import model_helper
 
 ACTOR_TYPE = actor.BaseActor
+API_ACTOR = actor.APIActor
 ROLE_TYPE = actor_role.BaseActorRole
 SCENE_TYPE = scene.BaseScene
 API_SCENE_TYPE = scene.BaseAPIScene
+WRITE_SCENE_TYPE = scene.BaseWriteScene
+PROJECTION_SCENE_TYPE = scene.BaseProjectionScene
+PROCESS_OFFLOAD = offload.ProcessOffload
+CONCURRENT_RUNNER = concurrency.ConcurrentRunner
+
+CHILDREN = "children"
+DELETED_KEY = "is_deleted"
+
+FIELDS_STEP = "fields"
+NESTED_STEP = "nested"
+SCENARIO_STEP = "scenario"
 
 
 def get_attribute(obj, field_name):
@@ -20,6 +36,34 @@ def set_attribute(obj, field_name, value):
     return obj
 
 
+def compile_projection_fields(roles: tuple[ROLE_TYPE, ...]) -> tuple:
+    return tuple(
+        (role.key, role.name, role.get_value, role.value_translator if role.key is not None else role.translate)
+        for role in roles
+    )
+
+
+def fill_projection(result: dict, fields: tuple, data) -> dict:
+    for key, _, get_value, translate in fields:
+        value = get_value(data)
+        if key is None:
+            k, v = translate(value)
+            result[k] = v
+        elif translate is None:
+            result[key] = value
+        else:
+            result[key] = translate(value)
+    return result
+
+
+def project(fields: tuple, data, deleted_key: str = DELETED_KEY):
+    if data is None:
+        return None
+    if isinstance(data, list):
+        return [fill_projection({}, fields, d) for d in data if not get_attribute(d, deleted_key)]
+    return fill_projection({}, fields, data)
+
+
 def get_next_role(role_name):
     if role_name == "request":
         return "models"
@@ -34,9 +78,14 @@ class Scenario:
             self,
             scenes: dict[str, SCENE_TYPE],
             actors: dict[str, ACTOR_TYPE],
+            *,
+            offload: PROCESS_OFFLOAD | None = None,
+            independent: bool = False,
     ):
         self.scenes = scenes
         self.actors = actors
+        self.offload = offload
+        self.independent = independent
 
     def _extract_data(self, position, data):
         raise NotImplementedError
@@ -45,6 +94,9 @@ class Scenario:
         raise NotImplementedError
 
     def _call_scene(self, scene_inst, data, req, extra):
+        if scene_inst.cpu_bound:
+            pool = self.offload or offload.get_default_offload()
+            return scene_inst.play_offloaded(pool, self.actors, data, req, extra)
         if isinstance(data, list):
             return [scene_inst(self.actors, d, req, extra) for d in data]
         else:
@@ -53,6 +105,20 @@ class Scenario:
     def has_scene(self, scene_name):
         return scene_name in self.scenes
 
+    def validate_many(self, scene_name, payloads):
+        _scene = self.scenes.get(scene_name, None)
+        if _scene is None or not isinstance(_scene, WRITE_SCENE_TYPE):
+            return []
+        return _scene.validate_many(self.actors, payloads)
+
+    def is_async(self, scene_name):
+        _scene = self.scenes.get(scene_name, None)
+        return _scene is not None and inspect.iscoroutinefunction(_scene.func)
+
+    def is_read_only(self, scene_name):
+        _scene = self.scenes.get(scene_name, None)
+        return _scene is None or _scene.read_only
+
     def __call__(self, scene_name, data, req, extra):
         _scene = self.scenes.get(scene_name, None)
         if _scene:
@@ -70,16 +136,47 @@ class APIScenario(Scenario):
             *,
             request_path: str | None = None,
             model_path: str | None = None,
-            response_path: str | None = None
+            response_path: str | None = None,
+            offload: PROCESS_OFFLOAD | None = None,
+            independent: bool = False,
+            deleted_key: str = DELETED_KEY,
     ):
-        super().__init__(scenes, actors)
+        super().__init__(scenes, actors, offload=offload, independent=independent)
         self.scenes = scenes
+        self.deleted_key = deleted_key
         self.path = {
             'request': request_path,
             'models': model_path,
             'response': response_path or request_path,
         }
 
+    def __call__(self, scene_name, data, req, extra):
+        _scene = self.scenes.get(scene_name, None)
+        if isinstance(_scene, WRITE_SCENE_TYPE) and self.path["models"]:
+            return self._play_children(_scene, req, extra)
+        return super().__call__(scene_name, data, req, extra)
+
+    def bind(self, model) -> "APIScenario":
+        if self.path["models"]:
+            model = model_helper.get_related_model(model, self.path["models"])
+        bound = copy.copy(self)
+        bound.actors = {
+            name: _actor.bind(model) if isinstance(_actor, API_ACTOR) else _actor
+            for name, _actor in self.actors.items()
+        }
+        return bound
+
+    def _play_children(self, _scene, req, extra):
+        request_key = self.path["request"] or self.path["response"]
+        rows = get_attribute(req, request_key) if request_key else None
+        if not isinstance(rows, list):
+            return None
+        loc = (validation.BODY, request_key)
+        contents = _scene.play_many(self.actors, rows, loc)
+        if extra is not None:
+            extra.setdefault(CHILDREN, []).append((self.path["models"], contents, loc, self.deleted_key))
+        return None
+
     def _extract_data(self, position, data):
         path = self.path.get(position, None)
         if path:
@@ -114,6 +211,150 @@ class APIScenario(Scenario):
         role_name = _scene.role_name if _scene.role_name == "models" else "response"
         return self.path[role_name], _scene.get_api_spec(self.actors)
 
+    def get_projection(self, scene_name):
+        _scene = self.scenes.get(scene_name, None)
+        if not isinstance(_scene, PROJECTION_SCENE_TYPE):
+            return None
+        fields = compile_projection_fields(_scene.get_projected_roles(self.actors))
+        return self.path["models"], self.path["response"], fields
+
+    def get_response_types(self, scene_name) -> dict[str, type]:
+        _scene = self.scenes.get(scene_name, None)
+        if not isinstance(_scene, PROJECTION_SCENE_TYPE):
+            return {}
+        roles = {id(role) for role in _scene.get_projected_roles(self.actors)}
+        return {
+            _actor.get_name("response"): _actor.get_typ("response")
+            for _actor in self.actors.values()
+            if isinstance(_actor, API_ACTOR) and id(_actor.get_role("models")) in roles
+        }
+
+
+def get_concurrent_steps(steps: tuple) -> tuple[int, ...]:
+    indexes = tuple(
+        index for index, (step, source, _, _) in enumerate(steps)
+        if step == SCENARIO_STEP and source.independent
+    )
+    return indexes if len(indexes) > 1 else ()
+
+
+def get_response_keys(steps: tuple) -> frozenset[str] | None:
+    keys = set()
+    for step, _, response_path, fields in steps:
+        if step == SCENARIO_STEP or any(key is None for key, _, _, _ in fields):
+            return None
+        keys.update([response_path] if step == NESTED_STEP else (key for key, _, _, _ in fields))
+    return frozenset(keys)
+
+
+class ProjectionLayout:
+    def __init__(self, scene_name: str, scenarios: list[APIScenario], runner: CONCURRENT_RUNNER | None = None):
+        self.scene_name = scene_name
+        self.runner = runner
+        self.types = {}
+        self.deleted_keys = {}
+        steps = []
+        for _scenario in scenarios:
+            if not _scenario.has_scene(scene_name):
+                continue
+            projection = _scenario.get_projection(scene_name)
+            if projection is None:
+                steps.append((SCENARIO_STEP, _scenario, None, None))
+                continue
+            model_path, response_path, fields = projection
+            if not response_path:
+                self.types.update(_scenario.get_response_types(scene_name))
+            if response_path:
+                steps.append((NESTED_STEP, model_path, response_path, fields))
+                self.deleted_keys[response_path] = _scenario.deleted_key
+            elif steps and steps[-1][0] == FIELDS_STEP and steps[-1][1] == model_path:
+                steps[-1] = (FIELDS_STEP, model_path, None, steps[-1][3] + fields)
+            else:
+                steps.append((FIELDS_STEP, model_path, None, fields))
+        self.steps = tuple(steps)
+        self.keys = get_response_keys(self.steps)
+        self.concurrent_steps = get_concurrent_steps(self.steps)
+        self.selected = None
+        self.needs_filter = False
+
+    @property
+    def columns(self) -> tuple[str, ...] | None:
+        if any(step == SCENARIO_STEP for step, _, _, _ in self.steps):
+            return None
+        return tuple(
+            name
+            for step, source, _, fields in self.steps if step == FIELDS_STEP and source is None
+            for _, name, _, _ in fields
+        )
+
+    def project_columns(self, entities: list) -> dict[str, list] | None:
+        if any(step != FIELDS_STEP or source is not None for step, source, _, _ in self.steps):
+            return None
+        columns = {}
+        for _, _, _, fields in self.steps:
+            for key, _, get_value, translate in fields:
+                if key is None:
+                    return None
+                values = [get_value(entity) for entity in entities]
+                columns[key] = values if translate is None else [translate(value) for value in values]
+        return columns
+
+    def narrow(self, selected: frozenset[str]) -> "ProjectionLayout":
+        steps = []
+        needs_filter = False
+        for step, source, response_path, fields in self.steps:
+            if step == FIELDS_STEP:
+                fields = tuple(field for field in fields if field[0] is None or field[0] in selected)
+                if fields:
+                    steps.append((step, source, response_path, fields))
+                needs_filter = needs_filter or any(field[0] is None for field in fields)
+            elif step == NESTED_STEP:
+                if response_path in selected:
+                    steps.append((step, source, response_path, fields))
+            else:
+                steps.append((step, source, response_path, fields))
+                needs_filter = True
+        layout = copy.copy(self)
+        layout.steps = tuple(steps)
+        layout.concurrent_steps = get_concurrent_steps(layout.steps)
+        layout.selected = selected
+        layout.needs_filter = needs_filter
+        return layout
+
+    def get_runner(self) -> CONCURRENT_RUNNER:
+        return self.runner or concurrency.get_default_runner()
+
+    def _play_concurrent(self, data) -> dict[int, any]:
+        if not self.concurrent_steps:
+            return {}
+        calls = []
+        for index in self.concurrent_steps:
+            source = self.steps[index][1]
+            calls.append((
+                lambda source=source: source(self.scene_name, data, {}, {}),
+                source.is_async(self.scene_name),
+            ))
+        return dict(zip(self.concurrent_steps, self.get_runner().run(calls)))
+
+    def __call__(self, data) -> dict:
+        result = {}
+        played = self._play_concurrent(data)
+        for index, (step, source, response_path, fields) in enumerate(self.steps):
+            if step == FIELDS_STEP:
+                fill_projection(result, fields, get_attribute(data, source) if source else data)
+            elif step == NESTED_STEP:
+                result[response_path] = project(fields, get_attribute(data, source) if source else data,
+                                                self.deleted_keys[response_path])
+            else:
+                if index in played:
+                    value = played[index]
+                else:
+                    value = self.get_runner().resolve(source(self.scene_name, data, {}, {}))
+                source.inject_to_response(result, value)
+        if self.needs_filter:
+            return {k: v for k, v in result.items() if k in self.selected}
+        return result
+
 
 class APIListScenario(APIScenario):
     def get_api_spec(self, scene_name):
@@ -1,7 +1,8 @@
 from typing import Callable
 
 from core import actor as actor_type
-from core import actor_role
+from core import actor_role, offload, validation
+from core.frozen import Frozen
 
 ACTOR_TYPE = actor_type.BaseActor
 ACTOR_MAP = dict[str, ACTOR_TYPE]
@@ -14,12 +15,26 @@ COOKIE_ROLE = actor_role.CookieFieldRole
 QUERY_ROLE = actor_role.QueryFieldRole
 JSON_ROLE = actor_role.JsonFieldRole
 
+VALIDATION_PLAN = validation.ValidationPlan
+SCENE_VALIDATION_ERROR = validation.SceneValidationError
+SCENE_PLAN = offload.ScenePlan
+PROCESS_OFFLOAD = offload.ProcessOffload
+
+CHANGES = "changes"
+MISSING = object()
+
 HEADER = "header"
 COOKIE = "cookie"
 QUERY = "query"
 JSON = "json"
 
 
+def get_value_of_obj(obj, field_name, default=MISSING):
+    if isinstance(obj, dict):
+        return obj.get(field_name, default)
+    return getattr(obj, field_name, default)
+
+
 def apply_update_to_obj(obj, field_name, update):
     if isinstance(obj, dict):
         obj[field_name] = update
@@ -42,7 +57,9 @@ def classify_role(role: ROLE_TYPE, **kwargs) -> tuple[str, any]:
     return name, field_spec
 
 
-class Cast:
+class Cast(Frozen):
+    __slots__ = ("required", "optional", "excluded")
+
     def __init__(
             self,
             required: set[str] | str = None,
@@ -53,23 +70,25 @@ class Cast:
         optional = optional or set()
         excluded = excluded or set()
 
-        if not isinstance(required, set) and not required == '*':
+        if not isinstance(required, (set, frozenset)) and not required == '*':
             raise ValueError("required must be set or '*'")
-        if not isinstance(optional, set) and not optional == '*':
+        if not isinstance(optional, (set, frozenset)) and not optional == '*':
             raise ValueError("optional must be set or '*'")
         if required == '*' and optional == '*':
             raise ValueError("required and optional can't be '*' at the same time")
-        if not isinstance(excluded, set):
+        if not isinstance(excluded, (set, frozenset)):
             raise ValueError("excluded must be set")
 
-        if isinstance(required, set) and isinstance(optional, set) and (required & optional):
+        required = required if required == '*' else frozenset(required)
+        optional = optional if optional == '*' else frozenset(optional)
+        excluded = frozenset(excluded)
+
+        if isinstance(required, frozenset) and isinstance(optional, frozenset) and (required & optional):
             raise ValueError("required and optional can't have common elements")
-        if isinstance(required, set) and isinstance(optional, set) and (required | optional) & excluded:
+        if isinstance(required, frozenset) and isinstance(optional, frozenset) and (required | optional) & excluded:
             raise ValueError("required and optional can't have common elements with excluded")
 
-        self.required = required
-        self.optional = optional
-        self.excluded = excluded
+        self._init_slots(required=required, optional=optional, excluded=excluded)
 
     def __call__(self, actors: ACTOR_MAP) -> tuple[ACTOR_MAP, ACTOR_MAP]:
         actors = self._exclude_actors(actors)
@@ -106,11 +125,27 @@ def get_actor_role_by_role_name(role_name: str, actors: ACTOR_MAP) -> ROLE_MAP:
             if actor.has_role(role_name)}
 
 
+class Staging:
+    __slots__ = ("actors", "main_roles", "sub_roles", "roles", "validation", "plan")
+
+    def __init__(self, actors: ACTOR_MAP, main_roles: tuple[ROLE_TYPE, ...], sub_roles: tuple[ROLE_TYPE, ...]):
+        self.actors = actors
+        self.main_roles = main_roles
+        self.sub_roles = sub_roles
+        self.roles = main_roles + sub_roles
+        self.validation = VALIDATION_PLAN(self.roles)
+        self.plan = None
+
+
 class BaseScene:
-    def __init__(self, role_name: str, cast: Cast, func: SCENE_LAMBDA = None):
+    read_only = False
+
+    def __init__(self, role_name: str, cast: Cast, func: SCENE_LAMBDA = None, *, cpu_bound: bool = False):
         self.role_name = role_name
         self.cast = cast
         self.func = func
+        self.cpu_bound = cpu_bound
+        self._stagings = {}
 
     def on_stage(self, actors: ACTOR_MAP):
         return self.cast(actors)
@@ -119,18 +154,53 @@ class BaseScene:
         role_name = self.role_name
         return get_actor_role_by_role_name(role_name, actors)
 
+    def stage(self, actors: ACTOR_MAP) -> Staging:
+        staging = self._stagings.get(id(actors))
+        if staging is None or staging.actors is not actors:
+            main_actors, sub_actors = self.on_stage(actors)
+            staging = Staging(
+                actors,
+                tuple(self.get_actor_role(main_actors).values()),
+                tuple(self.get_actor_role(sub_actors).values()),
+            )
+            self._stagings[id(actors)] = staging
+        return staging
+
+    def prime(self, actors: ACTOR_MAP, main_names: list[str], sub_names: list[str]) -> Staging:
+        role_name = self.role_name
+        staging = Staging(
+            actors,
+            tuple(actors[name].get_role(role_name) for name in main_names if actors[name].has_role(role_name)),
+            tuple(actors[name].get_role(role_name) for name in sub_names if actors[name].has_role(role_name)),
+        )
+        self._stagings[id(actors)] = staging
+        return staging
+
+    def get_plan(self, actors: ACTOR_MAP) -> tuple[SCENE_PLAN, bytes]:
+        if self.func is None:
+            raise NotImplementedError("func must be implemented")
+        staging = self.stage(actors)
+        if staging.plan is None:
+            plan = SCENE_PLAN(self.func, staging.main_roles, staging.sub_roles)
+            staging.plan = (plan, plan.dumps())
+        return staging.plan
+
+    def play_offloaded(self, pool: PROCESS_OFFLOAD, actors: ACTOR_MAP, data: any, req: any, extra: any):
+        plan, payload = self.get_plan(actors)
+        if isinstance(data, list):
+            return pool.map(plan, payload, data, req, extra)
+        return pool.call(plan, payload, data, req, extra)
+
     def __call__(self, actors: ACTOR_MAP, data: any, req: any, extra: any):
         if self.func is None:
             raise NotImplementedError("func must be implemented")
-        main_actors, sub_actors = self.on_stage(actors)
-        main_roles = self.get_actor_role(main_actors)
-        sub_roles = self.get_actor_role(sub_actors)
-        return self.func([*main_roles.values()], [*sub_roles.values()], data, req, extra)
+        staging = self.stage(actors)
+        return self.func(staging.main_roles, staging.sub_roles, data, req, extra)
 
 
 class BaseAPIScene(BaseScene):
-    def __init__(self, role_name: str, cast: Cast, func: SCENE_LAMBDA = None):
-        super().__init__(role_name, cast, func)
+    def __init__(self, role_name: str, cast: Cast, func: SCENE_LAMBDA = None, *, cpu_bound: bool = False):
+        super().__init__(role_name, cast, func, cpu_bound=cpu_bound)
 
     def get_api_spec(self, actors: ACTOR_MAP, **kwargs) -> dict[str, list[any]]:
         main_actors, sub_actors = self.on_stage(actors)
@@ -159,102 +229,142 @@ class BaseAPIScene(BaseScene):
         return api_field_specs
 
 
-class SummaryScene(BaseAPIScene):
-    def __init__(self, cast: Cast):
-        super().__init__("models", cast)
+class BaseProjectionScene(BaseAPIScene):
+    read_only = True
+
+    def __init__(self, role_name: str, cast: Cast, func: SCENE_LAMBDA = None, *, cpu_bound: bool = False):
+        if cpu_bound:
+            raise ValueError("projection scenes are played by ProjectionLayout and cannot be offloaded")
+        super().__init__(role_name, cast, func)
+
+    def get_projected_roles(self, actors: ACTOR_MAP) -> tuple[ROLE_TYPE, ...]:
+        raise NotImplementedError
 
-        def summary(main_roles: list[ROLE_TYPE], sub_roles: list[ROLE_TYPE], data: any, req: dict, extra: dict):
-            result = {}
-            for role in main_roles:
-                value = role.get_value(data)
-                k, v = role.translate(value)
-                result[k] = v
-            return result
 
-        self.func = summary
+def play_summary(main_roles: list[ROLE_TYPE], sub_roles: list[ROLE_TYPE], data: any, req: dict, extra: dict):
+    result = {}
+    for role in main_roles:
+        value = role.get_value(data)
+        k, v = role.translate(value)
+        result[k] = v
+    return result
 
 
-class DetailScene(BaseAPIScene):
+class SummaryScene(BaseProjectionScene):
     def __init__(self, cast: Cast):
-        super().__init__("models", cast)
+        super().__init__("models", cast, play_summary)
 
-        def detail(main_roles: list[ROLE_TYPE], sub_roles: list[ROLE_TYPE], data: any, req: dict, extra: dict):
-            result = {}
-            for role in main_roles + sub_roles:
-                value = role.get_value(data)
-                k, v = role.translate(value)
-                result[k] = v
-            return result
+    def get_projected_roles(self, actors: ACTOR_MAP) -> tuple[ROLE_TYPE, ...]:
+        return self.stage(actors).main_roles
 
-        self.func = detail
 
+def play_detail(main_roles: list[ROLE_TYPE], sub_roles: list[ROLE_TYPE], data: any, req: dict, extra: dict):
+    result = {}
+    for role in main_roles + sub_roles:
+        value = role.get_value(data)
+        k, v = role.translate(value)
+        result[k] = v
+    return result
 
-class CreateScene(BaseAPIScene):
-    def __init__(self, cast: Cast):
-        super().__init__("request", cast)
 
-        def create(main_roles: list[ROLE_TYPE], sub_roles: list[ROLE_TYPE], data: any, req: dict, extra: dict):
-            create_content = {}
-            exceptions = []
+class DetailScene(BaseProjectionScene):
+    def __init__(self, cast: Cast):
+        super().__init__("models", cast, play_detail)
 
-            for role in main_roles + sub_roles:
-                if role.name not in req:
-                    continue
-                value = role.get_value(req)
-                k, v = role.translate(value)
-                exception = role.validate(v)
-                if exception:
-                    exceptions.append(exception)
-                create_content[k] = v
+    def get_projected_roles(self, actors: ACTOR_MAP) -> tuple[ROLE_TYPE, ...]:
+        return self.stage(actors).roles
 
-            if exceptions:
-                raise ValueError()
-            for k, v in create_content.items():
-                apply_update_to_obj(data, k, v)
-            return data
 
-        self.func = create
+class BaseWriteScene(BaseAPIScene):
+    def __init__(self, role_name: str, cast: Cast, func: SCENE_LAMBDA = None, *, cpu_bound: bool = False):
+        if cpu_bound:
+            raise ValueError("write scenes change the session's entity and cannot be offloaded")
+        super().__init__(role_name, cast, func)
 
+    def validate(self, actors: ACTOR_MAP, req: dict) -> list[dict]:
+        plan = self.stage(actors).validation
+        return plan(req) if plan else []
+
+    def validate_many(self, actors: ACTOR_MAP, payloads: list[dict], loc: tuple = (validation.BODY,)) -> list[dict]:
+        return self.stage(actors).validation.validate_many(payloads, loc)
+
+    def play_many(self, actors: ACTOR_MAP, payloads: list[dict], loc: tuple = (validation.BODY,)) -> list[dict]:
+        staging = self.stage(actors)
+        errors = staging.validation.validate_many(payloads, loc)
+        if errors:
+            raise SCENE_VALIDATION_ERROR(errors)
+        contents = []
+        for index, payload in enumerate(payloads):
+            try:
+                contents.append(self.func(staging.main_roles, staging.sub_roles, {}, payload, {}))
+            except SCENE_VALIDATION_ERROR as e:
+                errors.extend({**error, "loc": [*loc, index, *error["loc"][1:]]} for error in e.errors)
+        if errors:
+            raise SCENE_VALIDATION_ERROR(errors)
+        return contents
 
-class UpdateScene(BaseAPIScene):
+    def __call__(self, actors: ACTOR_MAP, data: any, req: any, extra: any):
+        staging = self.stage(actors)
+        if staging.validation:
+            errors = staging.validation(req)
+            if errors:
+                raise SCENE_VALIDATION_ERROR(errors)
+        return self.func(staging.main_roles, staging.sub_roles, data, req, extra)
+
+
+def translate_request(roles: tuple[ROLE_TYPE, ...], req: dict) -> list[tuple[str, any]]:
+    values = []
+    errors = []
+    for role in roles:
+        if role.name not in req:
+            continue
+        try:
+            values.append(role.translate(role.get_value(req)))
+        except (TypeError, ValueError) as e:
+            errors.append(validation.make_error((validation.BODY, role.name), e))
+    if errors:
+        raise SCENE_VALIDATION_ERROR(errors)
+    return values
+
+
+def play_create(main_roles: list[ROLE_TYPE], sub_roles: list[ROLE_TYPE], data: any, req: dict, extra: dict):
+    for k, v in translate_request(main_roles + sub_roles, req):
+        apply_update_to_obj(data, k, v)
+    return data
+
+
+class CreateScene(BaseWriteScene):
     def __init__(self, cast: Cast):
-        super().__init__("request", cast)
+        super().__init__("request", cast, play_create)
+
 
-        def update(main_roles: list[ROLE_TYPE], sub_roles: list[ROLE_TYPE], data: any, request: dict, extra: dict):
-            update_content = {}
-            exceptions = []
+def play_update(main_roles: list[ROLE_TYPE], sub_roles: list[ROLE_TYPE], data: any, request: dict, extra: dict):
+    changes = {}
+    for k, v in translate_request(main_roles + sub_roles, request):
+        if get_value_of_obj(data, k) == v:
+            continue
+        apply_update_to_obj(data, k, v)
+        changes[k] = v
+    if extra is not None:
+        extra.setdefault(CHANGES, {}).update(changes)
+    return data
 
-            for role in main_roles + sub_roles:
-                if role.name not in request:
-                    continue
-                value = role.get_value(request)
-                k, v = role.translate(value)
-                exception = role.validate(v)
-                if exception:
-                    exceptions.append(exception)
-                update_content[k] = v
 
-            if exceptions:
-                raise ValueError()
+class UpdateScene(BaseWriteScene):
+    def __init__(self, cast: Cast):
+        super().__init__("request", cast, play_update)
 
-            for k, v in update_content.items():
-                apply_update_to_obj(data, k, v)
-            return data
 
-        self.func = update
+def play_delete(main_roles: list[ROLE_TYPE], sub_roles: list[ROLE_TYPE], data: any, req: dict, extra: dict):
+    if len(main_roles) > 1:
+        raise ValueError("main role must be one")
+    if not main_roles:
+        return data
+    main_role = main_roles[0]
+    apply_update_to_obj(data, main_role.name, True)
+    return data
 
 
 class DeleteScene(BaseAPIScene):
     def __init__(self, cast: Cast):
-        super().__init__("models", cast)
-
-        def delete(main_roles: list[ROLE_TYPE], sub_roles: list[ROLE_TYPE], data: any, req: dict, extra: dict):
-            if len(main_roles) > 1:
-                raise ValueError("main role must be one")
-            if not main_roles:
-                return data
-            main_role = main_roles[0]
-            apply_update_to_obj(data, main_role.name, True)
-            return data
-
-        self.func = delete
+        super().__init__("models", cast, play_delete)
@@ -0,0 +1,196 @@
+from sqlalchemy import column, delete, func, insert, inspect, literal_column, select, table, text
+from sqlalchemy.orm import Session
+
+
+def quote_terms(q: str) -> str:
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+class SearchBackend:
+    def __init__(self, table_name: str, id_column: str, columns: dict[str, str], deleted_column: str | None = None):
+        self.table_name = table_name
+        self.id_column = id_column
+        self.columns = columns
+        self.deleted_column = deleted_column
+        self.name = f"{table_name}_search"
+
+    def create(self, connection) -> None:
+        raise NotImplementedError
+
+    def rebuild(self, connection) -> None:
+        raise NotImplementedError
+
+    def index(self, connection, entity_id, values: dict[str, any]) -> None:
+        raise NotImplementedError
+
+    def remove(self, connection, entity_id) -> None:
+        raise NotImplementedError
+
+    def match(self, q: str):
+        raise NotImplementedError
+
+    def _quote(self, connection, name: str) -> str:
+        return connection.dialect.identifier_preparer.quote(name)
+
+    def _get_source_columns(self, connection) -> str:
+        return ", ".join(self._quote(connection, name) for name in self.columns.values())
+
+    def _get_source(self, connection) -> str:
+        source = f"FROM {self._quote(connection, self.table_name)}"
+        if self.deleted_column is None:
+            return source
+        deleted = self._quote(connection, self.deleted_column)
+        return f"{source} WHERE {deleted} IS NULL OR {deleted} = :deleted"
+
+
+class SQLiteSearchBackend(SearchBackend):
+    def __init__(self, table_name: str, id_column: str, columns: dict[str, str], deleted_column: str | None = None,
+                 tokenize: str = "unicode61"):
+        super().__init__(table_name, id_column, columns, deleted_column)
+        self.tokenize = tokenize
+        self.table = table(self.name, column("rowid"), column("rank"), *[column(key) for key in columns])
+
+    def create(self, connection) -> None:
+        columns = ", ".join(self._quote(connection, key) for key in self.columns)
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self._quote(connection, self.name)} "
+            f"USING fts5({columns}, tokenize='{self.tokenize}')"
+        ))
+
+    def rebuild(self, connection) -> None:
+        name = self._quote(connection, self.name)
+        connection.execute(text(f"DELETE FROM {name}"))
+        connection.execute(text(
+            f"INSERT INTO {name} (rowid, {', '.join(self._quote(connection, key) for key in self.columns)}) "
+            f"SELECT {self._quote(connection, self.id_column)}, {self._get_source_columns(connection)} "
+            f"{self._get_source(connection)}"
+        ), {"deleted": False})
+
+    def index(self, connection, entity_id, values: dict[str, any]) -> None:
+        self.remove(connection, entity_id)
+        connection.execute(insert(self.table).values(rowid=entity_id, **values))
+
+    def remove(self, connection, entity_id) -> None:
+        connection.execute(delete(self.table).where(self.table.c.rowid == entity_id))
+
+    def match(self, q: str):
+        matches = (
+            select(self.table.c.rowid.label("id"), self.table.c.rank.label("rank"))
+            .where(literal_column(self.name).op("MATCH")(quote_terms(q)))
+            .subquery()
+        )
+        return matches, matches.c.rank.asc()
+
+
+class PostgresSearchBackend(SearchBackend):
+    def __init__(self, table_name: str, id_column: str, columns: dict[str, str], deleted_column: str | None = None,
+                 config: str = "simple"):
+        super().__init__(table_name, id_column, columns, deleted_column)
+        self.config = config
+        self.table = table(self.name, column("id"), column("document"))
+
+    def create(self, connection) -> None:
+        name = self._quote(connection, self.name)
+        connection.execute(text(f"CREATE TABLE IF NOT EXISTS {name} (id BIGINT PRIMARY KEY, document TSVECTOR NOT NULL)"))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {self._quote(connection, self.name + '_document_idx')} "
+            f"ON {name} USING GIN (document)"
+        ))
+
+    def rebuild(self, connection) -> None:
+        name = self._quote(connection, self.name)
+        connection.execute(text(f"DELETE FROM {name}"))
+        connection.execute(text(
+            f"INSERT INTO {name} (id, document) "
+            f"SELECT {self._quote(connection, self.id_column)}, "
+            f"to_tsvector(CAST(:config AS regconfig), concat_ws(' ', {self._get_source_columns(connection)})) "
+            f"{self._get_source(connection)}"
+        ), {"config": self.config, "deleted": False})
+
+    def _to_tsvector(self, values: dict[str, any]):
+        return func.to_tsvector(self.config, func.concat_ws(" ", *[values[key] for key in self.columns]))
+
+    def index(self, connection, entity_id, values: dict[str, any]) -> None:
+        self.remove(connection, entity_id)
+        connection.execute(insert(self.table).values(id=entity_id, document=self._to_tsvector(values)))
+
+    def remove(self, connection, entity_id) -> None:
+        connection.execute(delete(self.table).where(self.table.c.id == entity_id))
+
+    def match(self, q: str):
+        query = func.plainto_tsquery(self.config, q)
+        matches = (
+            select(self.table.c.id, func.ts_rank(self.table.c.document, query).label("rank"))
+            .where(self.table.c.document.op("@@")(query))
+            .subquery()
+        )
+        return matches, matches.c.rank.desc()
+
+
+BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+class APISearch:
+    def __init__(self, fields: list[str], *, backends: dict[str, type[SearchBackend]] | None = None,
+                 deleted_key: str = "is_deleted", **options):
+        self.fields = tuple(fields)
+        self.deleted_key = deleted_key
+        self.backends = {**BACKENDS, **(backends or {})}
+        self.options = options
+        self.model = None
+        self.id_key = None
+        self._instances = {}
+
+    def bind(self, model) -> "APISearch":
+        mapper = inspect(model)
+        unknown = [key for key in self.fields if key not in mapper.column_attrs]
+        if unknown:
+            raise ValueError(f"'{model.__name__}' has no column {', '.join(unknown)} to search")
+        if len(mapper.primary_key) != 1:
+            raise ValueError(f"search on '{model.__name__}' needs a single-column primary key")
+        self.model = model
+        self.id_key = mapper.get_property_by_column(mapper.primary_key[0]).key
+        return self
+
+    def get_backend(self, dialect_name: str) -> SearchBackend:
+        backend = self._instances.get(dialect_name, None)
+        if backend is None:
+            backend_type = self.backends.get(dialect_name, None)
+            if backend_type is None:
+                raise ValueError(f"no search backend for dialect '{dialect_name}'")
+            mapper = inspect(self.model)
+            columns = {key: mapper.column_attrs[key].columns[0].name for key in self.fields}
+            deleted = mapper.column_attrs[self.deleted_key] if self.deleted_key in mapper.column_attrs else None
+            backend = backend_type(mapper.local_table.name, mapper.primary_key[0].name, columns,
+                                   deleted.columns[0].name if deleted is not None else None, **self.options)
+            self._instances[dialect_name] = backend
+        return backend
+
+    def _get_session_backend(self, db: Session) -> SearchBackend:
+        return self.get_backend(db.get_bind().dialect.name)
+
+    def create_index(self, connection, rebuild: bool = False) -> None:
+        backend = self.get_backend(connection.dialect.name)
+        backend.create(connection)
+        if rebuild:
+            backend.rebuild(connection)
+
+    def ensure_index(self, connection) -> bool:
+        backend = self.get_backend(connection.dialect.name)
+        if inspect(connection).has_table(backend.name):
+            return False
+        self.create_index(connection, rebuild=True)
+        return True
+
+    def index(self, db: Session, entity) -> None:
+        values = {key: getattr(entity, key) for key in self.fields}
+        self._get_session_backend(db).index(db.connection(), getattr(entity, self.id_key), values)
+
+    def remove(self, db: Session, entity) -> None:
+        self._get_session_backend(db).remove(db.connection(), getattr(entity, self.id_key))
+
+    def match(self, db: Session, q: str):
+        return self._get_session_backend(db).match(q)
@@ -0,0 +1,47 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import budget
+
+PAGE_SIZES = (1, 100)
+
+
+def assert_within_budgets(guards: dict[str, budget.QueryBudgetGuard]) -> None:
+    violations = [violation for guard in guards.values() for violation in guard.violations]
+    assert not violations, "query budgets exceeded:\n" + "\n".join(map(str, violations))
+
+
+def exercise(_chapter, page_sizes: tuple[int, ...] = PAGE_SIZES) -> None:
+    app = FastAPI()
+    app.include_router(_chapter.route)
+    client = TestClient(app)
+    summaries = []
+    for size in page_sizes:
+        response = client.get(_chapter.prefix, params={"size": size})
+        assert response.status_code == 200, f"{_chapter.name} catalog: {response.status_code} {response.text}"
+        summaries = response.json()["summaries"] or summaries
+    key = _chapter.connector.primary_keys[0]
+    if not summaries or key not in summaries[0]:
+        return
+    response = client.get(f"{_chapter.prefix}/{summaries[0][key]}")
+    assert response.status_code == 200, f"{_chapter.name} detail: {response.status_code} {response.text}"
+
+
+def check_budgets(registry: budget.BudgetRegistry, page_sizes: tuple[int, ...] = PAGE_SIZES) -> None:
+    for _chapter in registry.get_chapters().values():
+        exercise(_chapter, page_sizes)
+    assert_within_budgets(registry.get_guards())
+
+
+# Override in a conftest to return the registry the app's chapters were built with.
+@pytest.fixture
+def budget_registry() -> budget.BudgetRegistry:
+    return budget.BudgetRegistry()
+
+
+@pytest.fixture
+def query_budgets(budget_registry):
+    budget_registry.clear_violations()
+    yield budget_registry
+    check_budgets(budget_registry)
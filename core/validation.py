@@ -0,0 +1,61 @@
+from core import actor_role
+
+ROLE_TYPE = actor_role.BaseActorRole
+
+BODY = "body"
+
+
+class SceneValidationError(ValueError):
+    def __init__(self, errors: list[dict]):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def make_error(loc: tuple, exception: Exception) -> dict:
+    return {
+        "loc": list(loc),
+        "msg": str(exception) or type(exception).__name__,
+        "type": f"value_error.{type(exception).__name__.lower()}",
+    }
+
+
+def get_value_translator(role: ROLE_TYPE):
+    if role.key is None:
+        return lambda value: role.translate(value)[1]
+    return role.value_translator
+
+
+class ValidationPlan:
+    def __init__(self, roles: list[ROLE_TYPE]):
+        self.checks = tuple(
+            (role.name, role.validator, get_value_translator(role))
+            for role in roles if role.validator
+        )
+
+    def __bool__(self):
+        return bool(self.checks)
+
+    def __call__(self, payload: dict, loc: tuple = (BODY,)) -> list[dict]:
+        errors = []
+        for name, validator, value_translator in self.checks:
+            if name not in payload:
+                continue
+            value = payload[name]
+            try:
+                if value_translator is not None:
+                    value = value_translator(value)
+            except (TypeError, ValueError) as e:
+                errors.append(make_error((*loc, name), e))
+                continue
+            exception = validator(value)
+            if exception:
+                errors.append(make_error((*loc, name), exception))
+        return errors
+
+    def validate_many(self, payloads: list[dict], loc: tuple = (BODY,)) -> list[dict]:
+        if not self.checks:
+            return []
+        errors = []
+        for index, payload in enumerate(payloads):
+            errors.extend(self(payload, (*loc, index)))
+        return errors
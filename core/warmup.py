@@ -0,0 +1,29 @@
+import gc
+
+from fastapi import FastAPI
+
+from core import artifact, chapter
+
+API_CHAPTER = chapter.APIChapter
+PROJECTION_SCENES = ("summary", "detail")
+
+
+def warm_chapter(_chapter: API_CHAPTER) -> None:
+    _chapter.docs()
+    for _scenario in _chapter.scenarios:
+        for _scene in _scenario.scenes.values():
+            _scene.stage(_scenario.actors)
+    for scene_name in PROJECTION_SCENES:
+        if any(_scenario.has_scene(scene_name) for _scenario in _chapter.scenarios):
+            _chapter.get_layout(scene_name)
+
+
+def prefork(app: FastAPI, chapters: list[API_CHAPTER], *, artifact_path: str | None = None,
+            freeze: bool = True) -> None:
+    if artifact_path is None or not artifact.load_artifact(artifact_path, app, chapters):
+        app.openapi()
+    for _chapter in chapters:
+        warm_chapter(_chapter)
+    if freeze:
+        gc.collect()
+        gc.freeze()
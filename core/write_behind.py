@@ -0,0 +1,141 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+
+from sqlalchemy.orm import sessionmaker
+
+from core.helper import cache_helper, db_helper
+
+DB_HELPER = db_helper.DBHelper
+TTL_CACHE = cache_helper.TTLCache
+
+QUEUED = "queued"
+WRITTEN = "written"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class WriteBehind:
+    def __init__(
+            self,
+            *,
+            maxsize: int = 10000,
+            batch_size: int = 500,
+            interval: float = 0.5,
+            ticket_ttl: float = 300.0,
+            ticket_cache_size: int = 100000,
+    ):
+        if batch_size < 1 or maxsize < 1:
+            raise ValueError("batch_size and maxsize must be positive")
+        self.batch_size = batch_size
+        self.interval = interval
+        self.tickets = TTL_CACHE(ticket_ttl, ticket_cache_size)
+        self.connector = None
+        self.session_factory = None
+        self.on_flush = None
+        self._queue = queue.Queue(maxsize)
+        self._stopped = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closing = threading.Lock()
+
+    def bind(self, connector: DB_HELPER, session_factory: sessionmaker, on_flush=None) -> "WriteBehind":
+        self.connector = connector
+        self.session_factory = session_factory
+        self.on_flush = on_flush
+        return self
+
+    def start(self) -> None:
+        with self._lock:
+            if self._stopped.is_set() or self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.connector.model.__name__}",
+                                            daemon=True)
+            self._thread.start()
+
+    def submit(self, row: dict) -> str:
+        ticket = uuid.uuid4().hex
+        with self._closing:
+            if self._stopped.is_set():
+                raise QueueFull()
+            self.tickets.set(ticket, QUEUED)
+            try:
+                self._queue.put_nowait((ticket, row))
+            except queue.Full:
+                self.tickets.delete(ticket)
+                raise QueueFull()
+        self.start()
+        return ticket
+
+    def status(self, ticket: str) -> str | None:
+        return self.tickets.get(ticket)
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def close(self, timeout: float | None = None) -> None:
+        with self._closing:
+            self._stopped.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        while not self._queue.empty():
+            self._write(self._take(self.batch_size, block=False))
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            batch = self._take(self.batch_size, block=True)
+            if batch:
+                self._write(batch)
+
+    def _take(self, size: int, block: bool) -> list[tuple[str, dict]]:
+        batch = []
+        deadline = time.monotonic() + self.interval
+        while len(batch) < size:
+            timeout = deadline - time.monotonic()
+            try:
+                if block and timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _insert(self, db, rows: list[dict]) -> Exception | None:
+        try:
+            self.connector.bulk_insert(db, rows)
+            self.connector.commit(db)
+        except Exception as e:
+            self.connector.rollback(db)
+            return e
+        return None
+
+    def _write(self, batch: list[tuple[str, dict]]) -> None:
+        if not batch:
+            return
+        model_name = self.connector.model.__name__
+        errors = {}
+        db = self.session_factory()
+        try:
+            error = self._insert(db, [row for _, row in batch])
+            if error is not None:
+                logger.warning("write-behind flush of %d %s rows failed (%s), retrying row by row",
+                               len(batch), model_name, error)
+                errors = {ticket: self._insert(db, [row]) for ticket, row in batch}
+        finally:
+            db.close()
+        for ticket, _ in batch:
+            error = errors.get(ticket)
+            if error is not None:
+                logger.error("write-behind insert of %s row for ticket %s failed: %s", model_name, ticket, error)
+            self.tickets.set(ticket, WRITTEN if error is None else FAILED)
+        if len(batch) > sum(error is not None for error in errors.values()) and self.on_flush is not None:
+            self.on_flush()
@@ -0,0 +1,54 @@
+from fastapi import FastAPI
+
+from core import actor_role, actor, scene, scenario, chapter
+from core.db.base_class import Base
+from core.db.routing import SessionRouter
+from core.helper import db_helper
+from sample.models import sample
+
+API_SCENARIO = scenario.APIScenario
+API_ACTOR = actor.APIActor
+JSON_ROLE = actor_role.JsonFieldRole
+MODEL_ROLE = actor_role.ModelFieldRole
+Cast = scene.Cast
+
+PRIMARY_URL = "sqlite:///./primary.db"
+REPLICA_URL = "sqlite:///./replica.db"
+
+# primary.db takes every write; replica.db only serves reads, so a row created through
+# POST shows up on GET for the same client until the sticky window runs out, and is
+# missing from the replica afterwards unless something copies primary.db over it.
+router = SessionRouter.from_urls(
+    PRIMARY_URL,
+    [REPLICA_URL],
+    sticky_seconds=5.0,
+    connect_args={"check_same_thread": False},
+)
+
+for _sessionmaker in [router.primary, *router.replicas]:
+    Base.metadata.create_all(bind=_sessionmaker.kw["bind"])
+
+user_scenario = API_SCENARIO(
+    actors={
+        "id": API_ACTOR("id", int, JSON_ROLE, MODEL_ROLE, JSON_ROLE),
+        "name": API_ACTOR("name", str, JSON_ROLE, MODEL_ROLE, JSON_ROLE),
+        "age": API_ACTOR("age", int, JSON_ROLE, MODEL_ROLE, JSON_ROLE),
+        "deleted": API_ACTOR("is_deleted", bool, JSON_ROLE, MODEL_ROLE, JSON_ROLE),
+    },
+    scenes={
+        "summary": scene.SummaryScene(Cast({"id", "name"})),
+        "create": scene.CreateScene(Cast({"name", "age"})),
+        "detail": scene.DetailScene(Cast({"id", "name", "age"})),
+        "update": scene.UpdateScene(Cast(None, "*", {"id", "deleted"})),
+        "delete": scene.DeleteScene(Cast({"deleted"})),
+    })
+
+user_chapter = chapter.APIChapter(
+    "users",
+    db_helper.DBHelper(sample.User),
+    scenarios=[user_scenario],
+    router=router,
+)
+
+app = FastAPI()
+app.include_router(user_chapter.route)
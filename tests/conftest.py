@@ -0,0 +1,68 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core import actor, actor_role, chapter, scenario, scene
+from core.db.base_class import Base
+from core.db.routing import SessionRouter
+from core.helper.db_helper import DBHelper
+from sample.models.sample import User
+
+JSON_ROLE = actor_role.JsonFieldRole
+MODEL_ROLE = actor_role.ModelFieldRole
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+@pytest.fixture
+def router(session_factory):
+    return SessionRouter(session_factory)
+
+
+def user_actors() -> dict:
+    return {
+        "id": actor.APIActor("id", int, JSON_ROLE, MODEL_ROLE, JSON_ROLE),
+        "name": actor.APIActor("name", str, JSON_ROLE, MODEL_ROLE, JSON_ROLE),
+        "age": actor.APIActor("age", int, JSON_ROLE, MODEL_ROLE, JSON_ROLE),
+        "deleted": actor.APIActor("is_deleted", bool, JSON_ROLE, MODEL_ROLE, JSON_ROLE),
+    }
+
+
+def user_scenario(**kwargs) -> scenario.APIScenario:
+    update = kwargs.pop("update", None) or scene.UpdateScene(scene.Cast(None, "*", {"id", "deleted"}))
+    return scenario.APIScenario(actors=user_actors(), scenes={
+        "summary": scene.SummaryScene(scene.Cast({"id", "name"})),
+        "detail": scene.DetailScene(scene.Cast({"id", "name", "age"})),
+        "create": scene.CreateScene(scene.Cast({"name"}, {"age"})),
+        "update": update,
+        "delete": scene.DeleteScene(scene.Cast({"deleted"})),
+    }, **kwargs)
+
+
+def make_client(_chapter: chapter.APIChapter) -> TestClient:
+    app = FastAPI()
+    app.include_router(_chapter.route)
+    return TestClient(app)
+
+
+@pytest.fixture
+def users(router):
+    return chapter.APIChapter("users", DBHelper(User), [user_scenario()], router=router)
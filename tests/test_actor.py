@@ -0,0 +1,43 @@
+import pickle
+
+import pytest
+
+from core import actor, actor_role
+
+
+def make_actor() -> actor.BaseActor:
+    return actor.BaseActor({"json": actor_role.JsonFieldRole("name", typ=str)})
+
+
+def test_base_actor_roles_are_read_only():
+    _actor = make_actor()
+    with pytest.raises(AttributeError):
+        _actor.set_role("query", actor_role.QueryFieldRole("name", typ=str))
+    with pytest.raises(TypeError):
+        _actor.roles["query"] = actor_role.QueryFieldRole("name", typ=str)
+    with pytest.raises(AttributeError):
+        _actor.roles = {}
+    assert not _actor.has_role("query")
+
+
+def test_with_role_returns_a_copy():
+    _actor = make_actor()
+    query = actor_role.QueryFieldRole("name", typ=str)
+    extended = _actor.with_role("query", query)
+    assert extended.get_role("query") is query
+    assert not _actor.has_role("query")
+
+
+def test_actors_survive_pickling():
+    restored = pickle.loads(pickle.dumps(make_actor()))
+    assert restored.get_role("json").name == "name"
+    with pytest.raises(TypeError):
+        restored.roles["query"] = None
+
+
+def test_api_actor_roles_are_fixed():
+    _actor = actor.APIActor("name", str, actor_role.JsonFieldRole, actor_role.ModelFieldRole)
+    with pytest.raises(AttributeError):
+        _actor.set_role("request", actor_role.QueryFieldRole("name", typ=str))
+    with pytest.raises(AttributeError):
+        _actor.with_role("request", actor_role.QueryFieldRole("name", typ=str))
@@ -0,0 +1,20 @@
+from core import actor_role
+
+
+def test_translator_sequence_is_fused():
+    role = actor_role.JsonFieldRole("price", typ=int, translator=(
+        actor_role.Transform(lambda v: v * 2),
+        actor_role.Rename("cost"),
+        actor_role.Transform(lambda v: v + 1),
+    ))
+    assert role.key == "cost"
+    assert role.translate(5) == ("cost", 11)
+
+
+def test_custom_translators_run_in_order():
+    role = actor_role.ModelFieldRole("name", translator=[
+        actor_role.Rename("title"),
+        lambda k, v: (k.upper(), v.strip()),
+    ])
+    assert role.key is None
+    assert role.translate(" a ") == ("TITLE", "a")
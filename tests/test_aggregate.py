@@ -0,0 +1,44 @@
+import pytest
+
+from sample.models.sample import User
+from tests.conftest import make_client
+
+ROWS = [("a", 1), ("a", 3), ("b", 5)]
+
+
+@pytest.fixture
+def client(users):
+    client = make_client(users)
+    for name, age in ROWS:
+        client.post("/users", json={"name": name, "age": age})
+    return client
+
+
+def test_grouped_metrics(client):
+    response = client.get("/users/_aggregate", params={"group_by": "name", "metrics": "count,sum:age,max:age"})
+    assert response.json()["groups"] == [
+        {"name": "a", "count": 2, "max_age": 3, "sum_age": 4},
+        {"name": "b", "count": 1, "max_age": 5, "sum_age": 5},
+    ]
+
+
+def test_writes_invalidate_the_cache(client, session_factory):
+    reader = {"x-client-id": "reader"}
+    assert client.get("/users/_aggregate", headers=reader).json()["groups"] == [{"count": 3}]
+    with session_factory() as db:
+        db.add(User(name="c", age=7))
+        db.commit()
+    assert client.get("/users/_aggregate", headers=reader).json()["groups"] == [{"count": 3}]
+    client.post("/users", json={"name": "d", "age": 9})
+    assert client.get("/users/_aggregate", headers=reader).json()["groups"] == [{"count": 5}]
+
+
+@pytest.mark.parametrize("params, detail", [
+    ({"group_by": "nope"}, "unknown field: nope"),
+    ({"metrics": "avg:address"}, "unknown field: address"),
+    ({"metrics": "median:age"}, "unknown metric: median"),
+])
+def test_unknown_names_are_rejected(client, params, detail):
+    response = client.get("/users/_aggregate", params=params)
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
@@ -0,0 +1,66 @@
+from fastapi import FastAPI
+
+from core import artifact, chapter, scene
+from core.helper.db_helper import DBHelper
+from sample.models.sample import User
+from tests.conftest import user_scenario
+
+
+def make_scene(offset: int) -> scene.BaseScene:
+    if offset == 1:
+        return scene.BaseScene("json", scene.Cast({"id"}), lambda main, sub, data, req, extra: main["id"] + 1)
+    return scene.BaseScene("json", scene.Cast({"id"}), lambda main, sub, data, req, extra: main["id"] + 2)
+
+
+def test_lambda_body_changes_the_description():
+    first, second = make_scene(1), make_scene(2)
+    assert first.func.__qualname__ == second.func.__qualname__
+    assert artifact.describe(first) != artifact.describe(second)
+    assert artifact.describe(first) == artifact.describe(make_scene(1))
+
+
+def test_artifact_round_trip(tmp_path, users):
+    app = FastAPI()
+    app.include_router(users.route)
+    path = str(tmp_path / "api.json")
+    written = artifact.write_artifact(path, app, [users])
+    assert artifact.read_artifact(path) == written
+    assert artifact.load_artifact(path, app, [users])
+
+
+def test_unreadable_artifact_is_ignored(tmp_path):
+    path = tmp_path / "api.json"
+    path.write_text("{")
+    assert artifact.read_artifact(str(path)) is None
+    assert artifact.read_artifact(str(tmp_path / "missing.json")) is None
+
+
+def make_users(router) -> chapter.APIChapter:
+    return chapter.APIChapter("users", DBHelper(User), [user_scenario()], router=router)
+
+
+def make_app(*chapters) -> FastAPI:
+    app = FastAPI()
+    for _chapter in chapters:
+        app.include_router(_chapter.route)
+    return app
+
+
+def test_loading_does_not_build_routes(tmp_path, router):
+    path = str(tmp_path / "api.json")
+    built = make_users(router)
+    written = artifact.write_artifact(path, make_app(built), [built])
+
+    fresh, app = make_users(router), FastAPI()
+    assert artifact.load_artifact(path, app, [fresh])
+    assert fresh._router is None and fresh.api_docs == {}
+    assert app.openapi() == written["openapi"]
+
+
+def test_scenario_changes_invalidate_the_artifact(tmp_path, router):
+    path = str(tmp_path / "api.json")
+    built = make_users(router)
+    artifact.write_artifact(path, make_app(built), [built])
+    narrowed = chapter.APIChapter("users", DBHelper(User), [user_scenario(update=scene.UpdateScene(scene.Cast(None, {"name"})))], router=router)
+    assert not artifact.load_artifact(path, FastAPI(), [narrowed])
+    assert not artifact.load_artifact(path, FastAPI(title="other"), [make_users(router)])
@@ -0,0 +1,53 @@
+from typing import Optional
+
+import pytest
+
+from core import actor, actor_role, chapter, expansion, scenario, scene
+from core.helper.db_helper import DBHelper
+from sample.models.sample import Item, User
+
+JSON_ROLE = actor_role.JsonFieldRole
+MODEL_ROLE = actor_role.ModelFieldRole
+
+
+def untyped_scenario(*names: str) -> scenario.APIScenario:
+    return scenario.APIScenario(
+        actors={name: actor.APIActor(name, None, JSON_ROLE, MODEL_ROLE, JSON_ROLE) for name in names},
+        scenes={"summary": scene.SummaryScene(scene.Cast(set(names)))},
+    )
+
+
+def get_column(_scenario: scenario.APIScenario, name: str):
+    return _scenario.actors[name].roles[1].column
+
+
+def test_bind_leaves_a_shared_scenario_untouched(router):
+    shared = untyped_scenario("id", "name")
+    users = chapter.APIChapter("users", DBHelper(User), [shared], router=router)
+    items = chapter.APIChapter("items", DBHelper(Item), [shared], router=router)
+
+    assert get_column(shared, "name") is None
+    assert users.scenarios[0] is not shared and items.scenarios[0] is not users.scenarios[0]
+    assert users.scenarios[0].actors["name"].get_typ("response") == Optional[str]
+    assert get_column(users.scenarios[0], "name").max_length == 40
+    assert get_column(items.scenarios[0], "id").key == "id"
+
+
+def test_missing_attribute_fails_at_build_time(router):
+    shared = untyped_scenario("id", "address")
+    chapter.APIChapter("users", DBHelper(User), [shared], router=router)
+    with pytest.raises(ValueError, match="'Item' has no attribute 'address'"):
+        chapter.APIChapter("items", DBHelper(Item), [shared], router=router)
+    assert get_column(shared, "address") is None
+
+
+def test_expansion_layout_uses_the_bound_scenario(router):
+    owner = expansion.APIExpansion("user", untyped_scenario("id", "name"))
+    items = chapter.APIChapter("items", DBHelper(Item), [untyped_scenario("id", "name")], router=router,
+                               expansions=[owner])
+
+    bound = items.expansions["user"]
+    assert owner.layout is None and owner.connector is None
+    assert bound.scenario is not owner.scenario
+    assert bound.layout.types == {"id": int, "name": Optional[str]}
+    assert bound.batched and bound.local_key == "user_id"
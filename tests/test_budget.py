@@ -0,0 +1,40 @@
+import pytest
+
+from core import budget, chapter, testing
+from core.helper.db_helper import DBHelper
+from sample.models.sample import User
+from tests.conftest import user_scenario
+
+
+def make_users(router, session_factory, guard: budget.QueryBudgetGuard,
+               registry: budget.BudgetRegistry) -> chapter.APIChapter:
+    with session_factory() as db:
+        db.add_all([User(name=f"u{index}", age=index) for index in range(3)])
+        db.commit()
+    return chapter.APIChapter("users", DBHelper(User), [user_scenario()], router=router, budget_guard=guard,
+                               budget_registry=registry)
+
+
+def test_registered_chapters_stay_within_budget(router, session_factory, budget_registry, query_budgets):
+    guard = budget.QueryBudgetGuard({"summary": budget.QueryBudget(max_queries=2),
+                                     "detail": budget.QueryBudget(max_queries=1)})
+    make_users(router, session_factory, guard, budget_registry)
+    assert query_budgets is budget_registry
+    assert query_budgets.get_guards() == {"users": guard}
+
+
+def test_check_budgets_exercises_catalog_and_detail(router, session_factory, budget_registry):
+    guard = budget.QueryBudgetGuard({}, default=budget.QueryBudget(max_queries=0))
+    make_users(router, session_factory, guard, budget_registry)
+    with pytest.raises(AssertionError, match="query budgets exceeded") as error:
+        testing.check_budgets(budget_registry)
+    assert [violation.scene for violation in guard.violations] == ["summary", "summary", "detail"]
+    assert "SELECT" in str(error.value)
+
+
+def test_chapters_without_a_registry_are_not_tracked(router, session_factory, budget_registry):
+    guard = budget.QueryBudgetGuard({}, default=budget.QueryBudget(max_queries=0))
+    users = chapter.APIChapter("users", DBHelper(User), [user_scenario()], router=router, budget_guard=guard)
+    assert budget_registry.get_chapters() == {}
+    testing.exercise(users)
+    assert guard.violations
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core import actor, chapter, scenario, scene
+from core.helper.db_helper import DBHelper
+from sample.models.sample import Item, User
+from tests.conftest import JSON_ROLE, MODEL_ROLE, make_client, user_scenario
+
+
+def item_scenario(request_path: str = "items"):
+    actors = {name: actor.APIActor(name, typ, JSON_ROLE, MODEL_ROLE, JSON_ROLE)
+              for name, typ in (("id", int), ("name", str), ("price", int))}
+    return scenario.APIScenario(actors=actors, scenes={
+        "detail": scene.DetailScene(scene.Cast({"id", "name", "price"})),
+        "create": scene.CreateScene(scene.Cast({"name"}, {"price"})),
+        "update": scene.UpdateScene(scene.Cast(None, "*")),
+    }, model_path="items", request_path=request_path)
+
+
+@pytest.fixture
+def client(router):
+    return make_client(chapter.APIChapter("users", DBHelper(User), [user_scenario(), item_scenario()], router=router))
+
+
+def test_items_are_documented_as_a_list(client):
+    schemas = client.get("/openapi.json").json()["components"]["schemas"]
+    assert schemas["users_create_json"]["properties"]["items"]["type"] == "array"
+
+
+def test_create_and_update_children(client, session_factory):
+    response = client.post("/users", json={
+        "name": "u", "age": 1, "items": [{"name": "a", "price": 1}, {"name": "b", "price": 2}],
+    })
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()["items"]] == ["a", "b"]
+    assert client.post("/users", json={"name": "v", "age": 2}).status_code == 200
+
+    response = client.put("/users/1", json={"items": [{"id": 1, "name": "a", "price": 10}, {"name": "c", "price": 3}]})
+    assert response.status_code == 200
+    assert sorted((item["name"], item["price"]) for item in response.json()["items"]) == [("a", 10), ("c", 3)]
+
+    db = session_factory()
+    removed = db.get(Item, 2)
+    assert removed is not None and removed.is_deleted
+    assert db.get(User, 1).name == "u"
+
+
+def test_unknown_child_id_is_rejected(client):
+    client.post("/users", json={"name": "u", "age": 1, "items": [{"name": "a", "price": 1}]})
+    response = client.put("/users/1", json={"items": [{"id": 99, "name": "x", "price": 1}]})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "items", 0, "id"]
+
+
+def test_child_changes_stay_out_of_parent_changes(client):
+    client.post("/users", json={"name": "u", "age": 1, "items": [{"name": "a", "price": 1}]})
+    response = client.put("/users/1", json={"items": [{"id": 1, "name": "renamed", "price": 1}]})
+    assert response.status_code == 200
+    assert response.json()["name"] == "u"
+
+
+def test_unknown_child_loc_uses_the_request_key(router):
+    client = make_client(chapter.APIChapter("users", DBHelper(User), [user_scenario(), item_scenario("products")],
+                                            router=router))
+    client.post("/users", json={"name": "u", "age": 1, "products": [{"name": "a", "price": 1}]})
+    response = client.put("/users/1", json={"products": [{"id": 1, "name": "a", "price": 1},
+                                                         {"id": 99, "name": "x", "price": 1}]})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "products", 1, "id"]
+
+
+def test_nested_lists_use_the_scenario_deleted_key():
+    items = item_scenario()
+    archived = scenario.APIScenario(actors=items.actors, scenes=items.scenes, model_path="items",
+                                    response_path="items", deleted_key="archived")
+    user = SimpleNamespace(items=[SimpleNamespace(id=1, name="a", price=1, is_deleted=True, archived=False),
+                                  SimpleNamespace(id=2, name="b", price=2, is_deleted=False, archived=True)])
+    assert [row["id"] for row in scenario.ProjectionLayout("detail", [items])(user)["items"]] == [2]
+    assert [row["id"] for row in scenario.ProjectionLayout("detail", [archived])(user)["items"]] == [1]
@@ -0,0 +1,77 @@
+import gzip
+
+import pytest
+from starlette.requests import Request
+
+from core import chapter
+from core.helper.db_helper import DBHelper
+from core.response import compression
+from sample.models.sample import User
+from tests.conftest import make_client, user_scenario
+
+BODY = b'{"items":[' + b",".join(b'{"id":%d,"name":"user"}' % index for index in range(200)) + b"]}"
+
+
+def make_request(accept_encoding: str) -> Request:
+    return Request({"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]})
+
+
+def test_gzip_is_cached_on_the_body(monkeypatch):
+    calls = []
+    monkeypatch.setitem(compression.ENCODERS, compression.GZIP,
+                        lambda body, level: calls.append(level) or gzip.compress(body, level))
+    policy = compression.CompressionPolicy(encodings=(compression.GZIP,))
+    body = compression.EncodedBody(BODY)
+    for _ in range(2):
+        response = policy.respond(make_request("gzip, br;q=0"), body)
+        assert response.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(response.body) == BODY
+    assert calls == [6]
+
+
+def test_small_and_refused_bodies_are_sent_raw():
+    policy = compression.CompressionPolicy(encodings=(compression.GZIP,), min_size=len(BODY) + 1)
+    response = policy.respond(make_request("gzip"), compression.EncodedBody(BODY))
+    assert "content-encoding" not in response.headers and response.body == BODY
+    policy = compression.CompressionPolicy(encodings=(compression.GZIP,))
+    response = policy.respond(make_request("gzip;q=0, identity"), compression.EncodedBody(BODY))
+    assert "content-encoding" not in response.headers
+
+
+def test_brotli():
+    brotli = pytest.importorskip("brotli")
+    policy = compression.CompressionPolicy(encodings=(compression.BROTLI, compression.GZIP))
+    response = policy.respond(make_request("gzip, br"), compression.EncodedBody(BODY))
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(response.body) == BODY
+
+
+def test_zstd():
+    zstandard = pytest.importorskip("zstandard")
+    policy = compression.CompressionPolicy(encodings=(compression.ZSTD, compression.GZIP))
+    response = policy.respond(make_request("gzip, zstd"), compression.EncodedBody(BODY))
+    assert response.headers["content-encoding"] == "zstd"
+    assert zstandard.ZstdDecompressor().decompress(response.body) == BODY
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(ValueError):
+        compression.CompressionPolicy(encodings=("deflate",))
+
+
+def test_clients_pinned_after_a_write_skip_the_caches(router, session_factory):
+    users = chapter.APIChapter("users", DBHelper(User), [user_scenario()], router=router, response_cache_ttl=60)
+    client = make_client(users)
+    writer, reader = {"x-client-id": "writer"}, {"x-client-id": "reader"}
+
+    assert client.post("/users", json={"name": "a", "age": 1}, headers=writer).status_code == 200
+    assert client.get("/users", headers=reader).json()["total"] == 1
+    assert client.get("/users/_aggregate", headers=reader).json()["groups"] == [{"count": 1}]
+    with session_factory() as db:
+        db.add(User(name="b", age=2))
+        db.commit()
+
+    assert client.get("/users", headers=reader).json()["total"] == 1
+    assert client.get("/users/_aggregate", headers=reader).json()["groups"] == [{"count": 1}]
+    assert client.get("/users", headers=writer).json()["total"] == 2
+    assert client.get("/users/_aggregate", headers=writer).json()["groups"] == [{"count": 2}]
@@ -0,0 +1,35 @@
+import contextvars
+import threading
+
+from sqlalchemy import text
+
+from core import concurrency
+from core.db import stats
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def test_sync_calls_see_the_callers_context():
+    runner = concurrency.ConcurrentRunner(2)
+    request_id.set("r1")
+    try:
+        results = runner.run([(lambda: (request_id.get(), threading.get_ident()), False)] * 2)
+    finally:
+        runner.shutdown()
+    assert [value for value, _ in results] == ["r1", "r1"]
+    assert all(ident != threading.get_ident() for _, ident in results)
+
+
+def test_queries_in_worker_threads_are_counted(engine):
+    runner = concurrency.ConcurrentRunner(2)
+
+    def query():
+        with engine.connect() as conn:
+            return conn.execute(text("select 1")).scalar()
+
+    try:
+        with stats.track() as query_stats:
+            assert runner.run([(query, False), (query, False), (query, False)]) == [1, 1, 1]
+    finally:
+        runner.shutdown()
+    assert query_stats.count == 3
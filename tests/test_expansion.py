@@ -0,0 +1,81 @@
+from typing import Optional
+
+import pytest
+
+from core import actor, chapter, expansion, scenario, scene
+from core.db import stats
+from core.helper.db_helper import DBHelper
+from sample.models.sample import Item, User
+from tests.conftest import JSON_ROLE, MODEL_ROLE, make_client, user_scenario
+
+
+def item_scenario() -> scenario.APIScenario:
+    actors = {name: actor.APIActor(name, typ, JSON_ROLE, MODEL_ROLE, JSON_ROLE)
+              for name, typ in (("id", int), ("name", str), ("price", int), ("user_id", Optional[int]))}
+    return scenario.APIScenario(actors=actors, scenes={
+        "summary": scene.SummaryScene(scene.Cast({"id", "name", "user_id"})),
+        "detail": scene.DetailScene(scene.Cast({"id", "name", "price", "user_id"})),
+    })
+
+
+@pytest.fixture
+def data(session_factory):
+    with session_factory() as db:
+        ann, bob = User(name="ann", age=1), User(name="bob", age=2)
+        db.add_all([ann, bob])
+        db.flush()
+        db.add_all([
+            Item(name="pen", price=1, user_id=ann.id),
+            Item(name="ink", price=2, user_id=ann.id, is_deleted=True),
+            Item(name="cup", price=3, user_id=bob.id),
+            Item(name="orphan", price=4),
+        ])
+        db.commit()
+
+
+@pytest.fixture
+def users(router):
+    return make_client(chapter.APIChapter("users", DBHelper(User), [user_scenario()], router=router,
+                                          expansions=[expansion.APIExpansion("items", item_scenario())]))
+
+
+@pytest.fixture
+def items(router):
+    return make_client(chapter.APIChapter("items", DBHelper(Item), [item_scenario()], router=router,
+                                          expansions=[expansion.APIExpansion("user", user_scenario())]))
+
+
+def count_queries(client, path: str, **params) -> tuple[dict, int]:
+    with stats.track() as query_stats:
+        response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return response.json(), query_stats.count
+
+
+def test_one_to_many_expansion(users, data):
+    _, plain = count_queries(users, "/users")
+    content, expanded = count_queries(users, "/users", expand="items")
+    assert expanded == plain + 1
+    assert [[item["name"] for item in row["items"]] for row in content["summaries"]] == [["pen"], ["cup"]]
+
+    detail, queries = count_queries(users, "/users/1", expand="items")
+    assert detail["items"] == [{"id": 1, "name": "pen", "user_id": 1}]
+    assert queries == 2
+
+
+def test_many_to_one_expansion(items, data):
+    _, plain = count_queries(items, "/items")
+    content, expanded = count_queries(items, "/items", expand="user")
+    assert expanded == plain + 1
+    assert [row["user"] and row["user"]["name"] for row in content["summaries"]] == ["ann", "ann", "bob", None]
+
+
+def test_expansion_with_narrowed_fields(items, data):
+    content, _ = count_queries(items, "/items", fields="name", expand="user")
+    assert content["summaries"][0] == {"name": "pen", "user": {"id": 1, "name": "ann"}}
+
+
+def test_unknown_expansion_is_rejected(users):
+    response = users.get("/users", params={"expand": "friends"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "unknown expand: friends"
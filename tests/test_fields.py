@@ -0,0 +1,51 @@
+import pytest
+
+from core.db import stats
+from tests.conftest import make_client
+
+
+@pytest.fixture
+def client(users):
+    client = make_client(users)
+    client.post("/users", json={"name": "a", "age": 1})
+    return client
+
+
+def get_select(query_stats) -> str:
+    [statement] = [statement for statement, _ in query_stats.statements
+                   if statement.startswith("SELECT") and "count(" not in statement]
+    return statement.split(" FROM ")[0]
+
+
+def test_fields_narrow_the_response(client):
+    assert client.get("/users", params={"fields": "name"}).json()["summaries"] == [{"name": "a"}]
+    assert client.get("/users/1", params={"fields": "age, id"}).json() == {"id": 1, "age": 1}
+    assert client.get("/users/1").json() == {"id": 1, "name": "a", "age": 1}
+
+
+@pytest.mark.parametrize("path", ["/users", "/users/1"])
+def test_fields_limit_the_selected_columns(client, path):
+    with stats.track(capture=True) as query_stats:
+        client.get(path, params={"fields": "name"})
+    columns = get_select(query_stats)
+    assert "user.name" in columns and "user.id" in columns and "user.is_deleted" in columns
+    assert "user.age" not in columns and "user.address" not in columns
+
+
+@pytest.mark.parametrize("path", ["/users", "/users/1"])
+def test_unknown_fields_are_rejected(client, path):
+    response = client.get(path, params={"fields": "name,address,nope"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "unknown field: address, nope"
+
+
+def test_narrowed_layouts_are_cached_per_scene_and_field_set(client, users):
+    users.get_narrowed_layout.cache_clear()
+    for fields in ("name,id", "id, name", "name,id,"):
+        client.get("/users", params={"fields": fields})
+    client.get("/users/1", params={"fields": "name,id"})
+    client.get("/users", params={"fields": "name"})
+    info = users.get_narrowed_layout.cache_info()
+    assert (info.hits, info.misses) == (2, 3)
+    assert users.get_narrowed_layout("summary", frozenset({"id", "name"})) is users.get_narrowed_layout(
+        "summary", frozenset({"name", "id"}))
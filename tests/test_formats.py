@@ -0,0 +1,54 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from core.response import formats
+from tests.conftest import make_client
+
+MSGPACK_TYPE = formats.MEDIA_TYPES[formats.MSGPACK]
+ARROW_TYPE = formats.MEDIA_TYPES[formats.ARROW]
+
+
+def make_request(accept: str) -> Request:
+    return Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+
+
+@pytest.mark.parametrize("accept, available, expected", [
+    ("", formats.AVAILABLE, formats.JSON),
+    ("text/html", formats.AVAILABLE, formats.JSON),
+    ("application/json;q=0.5, application/x-msgpack", frozenset({formats.JSON, formats.MSGPACK}), formats.MSGPACK),
+    (f"{ARROW_TYPE}, application/json;q=0.1", frozenset({formats.JSON}), formats.JSON),
+])
+def test_negotiate(accept, available, expected):
+    assert formats.negotiate(make_request(accept), available) == expected
+
+
+def test_unsupported_media_type_is_refused():
+    with pytest.raises(HTTPException) as error:
+        formats.negotiate(make_request(ARROW_TYPE), frozenset({formats.JSON}))
+    assert error.value.status_code == 406
+
+
+@pytest.fixture
+def client(users):
+    client = make_client(users)
+    for name, age in [("a", 1), ("b", 2)]:
+        client.post("/users", json={"name": name, "age": age})
+    return client
+
+
+def test_msgpack_catalog(client):
+    msgpack = pytest.importorskip("msgpack")
+    response = client.get("/users", headers={"accept": MSGPACK_TYPE})
+    assert response.headers["content-type"] == MSGPACK_TYPE
+    assert msgpack.unpackb(response.content) == client.get("/users").json()
+
+
+def test_arrow_export(client):
+    pyarrow = pytest.importorskip("pyarrow")
+    response = client.get("/users/_export", headers={"accept": ARROW_TYPE})
+    assert response.headers["content-type"] == ARROW_TYPE
+    table = pyarrow.ipc.open_stream(response.content).read_all()
+    assert table.to_pydict() == {"id": [1, 2], "name": ["a", "b"]}
+    assert table.schema.field("id").type == pyarrow.int64()
+    assert table.schema.metadata[b"total"] == b"2"
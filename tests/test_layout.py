@@ -0,0 +1,72 @@
+import pytest
+
+from core import actor, scenario, scene
+from sample.models.sample import Item, User
+from tests.conftest import JSON_ROLE, MODEL_ROLE
+
+
+def shout(main_roles, sub_roles, data, req, extra):
+    return {"shout": data.name.upper()}
+
+
+def make_scenarios() -> list[scenario.APIScenario]:
+    user_actors = {
+        "id": actor.APIActor("id", int, JSON_ROLE, MODEL_ROLE, JSON_ROLE),
+        "name": actor.APIActor("name", str, JSON_ROLE, MODEL_ROLE, JSON_ROLE),
+        "age": actor.APIActor("age", int, JSON_ROLE, MODEL_ROLE, JSON_ROLE, response_name="years"),
+    }
+    item_actors = {name: actor.APIActor(name, typ, JSON_ROLE, MODEL_ROLE, JSON_ROLE)
+                   for name, typ in (("id", int), ("name", str), ("price", int))}
+    scenarios = [
+        scenario.APIScenario(actors=user_actors, scenes={
+            "summary": scene.SummaryScene(scene.Cast({"id", "name"})),
+            "detail": scene.DetailScene(scene.Cast({"id", "name"}, {"age"})),
+        }),
+        scenario.APIScenario(actors=item_actors, scenes={
+            "summary": scene.SummaryScene(scene.Cast({"id"})),
+            "detail": scene.DetailScene(scene.Cast({"id", "name", "price"})),
+        }, model_path="items", response_path="items"),
+        scenario.APIScenario(actors={"name": user_actors["name"]}, scenes={
+            "summary": scene.BaseAPIScene("models", scene.Cast({"name"}), shout),
+            "detail": scene.BaseAPIScene("models", scene.Cast({"name"}), shout),
+        }),
+    ]
+    return [_scenario.bind(User) for _scenario in scenarios]
+
+
+def inject(scene_name: str, scenarios: list[scenario.APIScenario], data) -> dict:
+    result = {}
+    for _scenario in scenarios:
+        if _scenario.has_scene(scene_name):
+            _scenario.inject_to_response(result, _scenario(scene_name, data, {}, {}))
+    return result
+
+
+@pytest.fixture
+def user():
+    return User(id=1, name="ann", age=30, items=[Item(id=1, name="pen", price=2), Item(id=2, name="ink", price=5)])
+
+
+@pytest.mark.parametrize("scene_name", ["summary", "detail"])
+def test_layout_matches_the_inject_path(user, scene_name):
+    scenarios = make_scenarios()
+    layout = scenario.ProjectionLayout(scene_name, scenarios)
+    assert layout(user) == inject(scene_name, scenarios, user)
+
+
+def test_layout_output(user):
+    scenarios = make_scenarios()
+    assert scenario.ProjectionLayout("detail", scenarios)(user) == {
+        "id": 1, "name": "ann", "years": 30, "shout": "ANN",
+        "items": [{"id": 1, "name": "pen", "price": 2}, {"id": 2, "name": "ink", "price": 5}],
+    }
+    summary = scenario.ProjectionLayout("summary", scenarios)
+    assert summary.columns is None
+    assert [step for step, _, _, _ in summary.steps] == [scenario.FIELDS_STEP, scenario.NESTED_STEP,
+                                                         scenario.SCENARIO_STEP]
+
+
+def test_plain_layouts_expose_their_columns(user):
+    layout = scenario.ProjectionLayout("detail", make_scenarios()[:1])
+    assert layout.columns == ("id", "name", "age")
+    assert layout.project_columns([user]) == {"id": [1], "name": ["ann"], "years": [30]}
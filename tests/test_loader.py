@@ -0,0 +1,54 @@
+from core.db import loader, stats
+from core.helper.db_helper import DBHelper
+from sample.models.sample import Item, User
+
+
+def add_users(session_factory, count: int) -> list[int]:
+    with session_factory() as db:
+        users = [User(name=f"u{index}", age=index) for index in range(count)]
+        db.add_all(users)
+        db.commit()
+        return [user.id for user in users]
+
+
+def test_deferred_reads_share_one_query(session_factory):
+    ids = add_users(session_factory, 3)
+    connector = DBHelper(User)
+    with session_factory() as db, stats.track() as query_stats:
+        deferred = [connector.defer(db, entity_id) for entity_id in ids]
+        assert query_stats.count == 0
+        assert [entity.id for entity in (handle.get() for handle in deferred)] == ids
+        assert connector.get(db, ids[0]).id == ids[0]
+    assert query_stats.count == 1
+
+
+def test_get_dispatches_keys_queued_by_other_callers(session_factory):
+    ids = add_users(session_factory, 3)
+    connector = DBHelper(User)
+    with session_factory() as db, stats.track() as query_stats:
+        connector.load(db, ids[1:])
+        connector.get(db, ids[0])
+        assert [entity.id for entity in connector.get_many(db, ids)] == ids
+    assert query_stats.count == 1
+
+
+def test_models_are_dispatched_separately(session_factory):
+    ids = add_users(session_factory, 2)
+    with session_factory() as db:
+        db.add(Item(name="pen", price=1, user_id=ids[0]))
+        db.commit()
+    with session_factory() as db, stats.track() as query_stats:
+        user = DBHelper(User).defer(db, ids[1])
+        item = DBHelper(Item).defer(db, 1)
+        assert item.get().name == "pen"
+        assert query_stats.count == 1
+        assert user.get().id == ids[1]
+    assert query_stats.count == 2
+
+
+def test_missing_keys_are_memoised(session_factory):
+    with session_factory() as db, stats.track() as query_stats:
+        request_loader = loader.get_loader(db)
+        assert request_loader.get(User, 404) is None
+        assert request_loader.get(User, 404) is None
+    assert query_stats.count == 1
@@ -0,0 +1,55 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import chapter, metrics
+from core.helper.db_helper import DBHelper
+from core.response import compression
+from sample.models.sample import User
+from tests.conftest import user_scenario
+
+
+def make_app(router, **kwargs) -> tuple[metrics.MetricsRegistry, TestClient]:
+    registry = metrics.MetricsRegistry()
+    users = chapter.APIChapter("users", DBHelper(User), [user_scenario()], router=router, metrics=registry,
+                               **kwargs)
+    app = FastAPI()
+    app.include_router(users.route)
+    registry.install(app)
+    return registry, TestClient(app)
+
+
+def get_histogram(registry: metrics.MetricsRegistry, name: str, endpoint: str) -> list:
+    _, histograms = registry.collect()
+    return histograms[(name, (("chapter", "users"), ("endpoint", endpoint)))]
+
+
+def test_payload_size_is_recorded_for_every_response(router):
+    registry, client = make_app(router)
+    assert client.post("/users", json={"name": "a", "age": 1}).status_code == 200
+    model_response = client.get("/users/1")
+    json_response = client.get("/users", params={"fields": "name"})
+
+    detail = get_histogram(registry, metrics.PAYLOAD, "detail")
+    summary = get_histogram(registry, metrics.PAYLOAD, "summary")
+    assert detail[-1] == len(model_response.content) and sum(detail[:-1]) == 1
+    assert summary[-1] == len(json_response.content) and sum(summary[:-1]) == 1
+
+
+def test_payload_size_counts_encoded_bytes(router):
+    registry, client = make_app(router, compression=compression.CompressionPolicy(min_size=0,
+                                                                                  encodings=(compression.GZIP,)))
+    for index in range(20):
+        client.post("/users", json={"name": f"user {index}", "age": index})
+    response = client.get("/users", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert get_histogram(registry, metrics.PAYLOAD, "summary")[-1] == len(gzip.compress(response.content, 6,
+                                                                                        mtime=0))
+
+
+def test_requests_are_labelled_by_endpoint(router):
+    registry, client = make_app(router)
+    client.get("/users/404")
+    text = client.get("/metrics").text
+    assert 'scenario_requests_total{chapter="users",endpoint="detail",status="404"} 1' in text
@@ -0,0 +1,65 @@
+import pytest
+
+from core import offload, scenario, scene
+from tests.conftest import user_actors
+
+
+def shout(main_roles, sub_roles, data, req, extra):
+    return {role.name: str(role.get_value(data)).upper() for role in main_roles}
+
+
+class RowScenario(scenario.Scenario):
+    def _extract_data(self, position, data):
+        return data
+
+
+def test_cpu_bound_scene_runs_in_the_pool_in_order():
+    pool = offload.ProcessOffload(1, chunk_size=2, inline_below=0)
+    try:
+        _scenario = RowScenario({"shout": scene.BaseScene("models", scene.Cast({"name"}), shout, cpu_bound=True)},
+                                user_actors(), offload=pool)
+        rows = [{"name": f"n{i}"} for i in range(5)]
+        assert _scenario("shout", rows, {}, {}) == [{"name": f"N{i}"} for i in range(5)]
+    finally:
+        pool.shutdown()
+
+
+class OffloadedUpdate(scene.BaseWriteScene):
+    pass
+
+
+def test_write_and_projection_scenes_cannot_be_offloaded():
+    with pytest.raises(ValueError):
+        OffloadedUpdate("request", scene.Cast(None, "*"), scene.play_update, cpu_bound=True)
+    with pytest.raises(ValueError):
+        scene.BaseProjectionScene("models", scene.Cast({"id"}), scene.play_summary, cpu_bound=True)
+    with pytest.raises(TypeError):
+        scene.UpdateScene(scene.Cast(None, "*"), cpu_bound=True)
+
+
+def upper(main_roles, sub_roles, data, req, extra):
+    return {"name": data["name"].upper()}
+
+
+class ExplodingExecutor:
+    def submit(self, *args):
+        raise AssertionError("should run inline")
+
+    map = submit
+
+
+@pytest.mark.parametrize("inline_below, count, inline", [(0, 1, False), (1, 1, False), (2, 1, True),
+                                                          (3, 2, True), (3, 3, False)])
+def test_small_batches_run_inline(inline_below, count, inline):
+    pool = offload.ProcessOffload(1, inline_below=inline_below)
+    assert pool.is_inline(count) is inline
+
+
+def test_single_rows_and_small_batches_skip_the_pool():
+    pool = offload.ProcessOffload(1, inline_below=2)
+    pool._executor = ExplodingExecutor()
+    plan = offload.ScenePlan(upper, (), ())
+    assert pool.call(plan, b"", {"name": "a"}, {}, {}) == {"name": "A"}
+    assert pool.map(plan, b"", [{"name": "b"}], {}, {}) == [{"name": "B"}]
+    with pytest.raises(AssertionError):
+        pool.map(plan, b"", [{"name": "c"}, {"name": "d"}], {}, {})
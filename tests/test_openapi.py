@@ -0,0 +1,76 @@
+import gzip
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import openapi
+
+
+def make_app(*chapters) -> FastAPI:
+    app = FastAPI(title="api", version="1", summary="sample")
+    for _chapter in chapters:
+        app.include_router(_chapter.route)
+
+    @app.get("/health")
+    def health() -> dict:
+        return {}
+
+    return app
+
+
+def test_merge_fragment():
+    document = {"paths": {"/a": {"get": 1}}, "components": {"schemas": {"A": 1}}}
+    openapi.merge_fragment(document, {"paths": {"/a": {"post": 2}, "/b": {"get": 3}},
+                                      "components": {"schemas": {"B": 2}, "responses": {"R": 3}}})
+    assert document == {
+        "paths": {"/a": {"get": 1, "post": 2}, "/b": {"get": 3}},
+        "components": {"schemas": {"A": 1, "B": 2}, "responses": {"R": 3}},
+    }
+    assert openapi.merge_fragment({}, {}) == {"paths": {}}
+
+
+def test_built_document_matches_fastapi(users):
+    app = make_app(users)
+    expected = app.openapi()
+    document = openapi.OpenAPIDocument(app, [users]).build()
+    assert document == json.loads(json.dumps(expected))
+    assert document["info"]["summary"] == "sample"
+    assert "/health" in document["paths"] and "/users/{item_id}" in document["paths"]
+
+
+def test_chapter_routes_come_from_the_fragment(users):
+    app = make_app(users)
+    fragment = users.openapi_fragment()
+    fragment["paths"]["/users"]["get"]["summary"] = "from fragment"
+    keys = openapi.get_route_keys(users.route.routes)
+    assert ("/users", "GET") in keys and ("/health", "GET") not in keys
+    document = openapi.OpenAPIDocument(app, [users]).build()
+    assert document["paths"]["/users"]["get"]["summary"] == "from fragment"
+    assert document["paths"]["/health"]["get"]["summary"] == "Health"
+
+
+def test_served_document(users):
+    app = make_app(users)
+    document = openapi.OpenAPIDocument(app, [users]).install()
+    client = TestClient(app)
+
+    response = client.get("/openapi.json", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == document.etag
+    assert response.json() == document.schema
+    assert gzip.decompress(document.gzip_body) == document.body == response.content
+
+    plain = client.get("/openapi.json", headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.content == document.body
+    assert client.get("/openapi.json", headers={"if-none-match": document.etag}).status_code == 304
+    assert app.openapi() is document.schema
+    assert [route.path for route in app.routes].count("/openapi.json") == 1
+
+
+def test_prebuilt_schema_is_served_as_is(users):
+    app = make_app(users)
+    app.openapi_schema = {"openapi": "3.1.0", "info": {"title": "cached"}, "paths": {}}
+    document = openapi.OpenAPIDocument(app, [users]).install()
+    assert TestClient(app).get("/openapi.json").json()["info"] == {"title": "cached"}
+    assert users._openapi_fragment is None and document.schema is app.openapi_schema
@@ -0,0 +1,47 @@
+import pytest
+
+from core.db import stats
+from core.helper.db_helper import DBHelper
+from sample.models.sample import User
+from tests.conftest import make_client
+
+
+@pytest.fixture
+def ids(session_factory):
+    with session_factory() as db:
+        users = [User(name=f"u{index}", age=index % 3) for index in range(7)]
+        db.add_all(users)
+        db.commit()
+        return [user.id for user in users]
+
+
+@pytest.mark.parametrize("offset, limit", [(0, 3), (3, 3), (6, 3), (2, 10), (0, 1)])
+def test_lambda_statement_binds_each_page(session_factory, ids, offset, limit):
+    connector = DBHelper(User)
+    with session_factory() as db:
+        for _ in range(2):
+            entities, total = connector.find_and_count(db, offset=offset, limit=limit)
+            assert [entity.id for entity in entities] == ids[offset:offset + limit]
+            assert total == 7
+
+
+def test_pages_share_one_connector(session_factory, ids):
+    connector = DBHelper(User)
+    with session_factory() as db, stats.track(capture=True) as query_stats:
+        pages = [[entity.id for entity in connector.find_and_count(db, offset=offset, limit=2)[0]]
+                 for offset in (0, 2, 4, 6)]
+    assert pages == [ids[0:2], ids[2:4], ids[4:6], ids[6:]]
+    assert len({statement for statement, _ in query_stats.statements}) == 2
+
+
+def test_catalog_pages_and_filters(users, ids):
+    client = make_client(users)
+    first = client.get("/users", params={"size": 3}).json()
+    second = client.get("/users", params={"size": 3, "page": 1}).json()
+    assert [row["id"] for row in first["summaries"] + second["summaries"]] == ids[:6]
+    assert first["total"] == second["total"] == 7
+
+    filtered = client.get("/users", params={"size": 2, "filter": "age:eq:1"}).json()
+    assert [row["id"] for row in filtered["summaries"]] == [ids[1], ids[4]]
+    assert filtered["total"] == 2
+    assert [row["id"] for row in client.get("/users", params={"size": 2}).json()["summaries"]] == ids[:2]
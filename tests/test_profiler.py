@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+import time
+
+import pytest
+from sqlalchemy import text
+
+from core import profiler
+
+
+def run(slow_profiler, engine, chapter="users", scene="detail", slow=True):
+    with slow_profiler.track(chapter, scene) as active, engine.connect() as conn:
+        conn.execute(text("SELECT 'early'"))
+        if slow:
+            timeout = time.monotonic() + 5
+            while active.sampling is None and time.monotonic() < timeout:
+                time.sleep(0.005)
+            conn.execute(text("SELECT 'late'"))
+        return active
+
+
+def read_reports(directory) -> list[dict]:
+    return [json.loads((directory / name).read_text()) for name in sorted(os.listdir(directory))]
+
+
+def make_profiler(directory, **kwargs) -> profiler.SlowRequestProfiler:
+    return profiler.SlowRequestProfiler(str(directory), **{"threshold": 0.01, "interval": 0.001, **kwargs})
+
+
+def test_only_slow_requests_are_written(tmp_path, engine):
+    run(make_profiler(tmp_path, threshold=60), engine, slow=False)
+    assert not os.listdir(tmp_path)
+
+    run(make_profiler(tmp_path), engine)
+    [report] = read_reports(tmp_path)
+    assert (report["chapter"], report["scene"], report["queries"]) == ("users", "detail", 2)
+    assert [sql["statement"] for sql in report["sql"]] == ["SELECT 'late'"]
+    assert report["duration"] >= 0.01 and report["samples"]
+
+
+def test_cooldown_skips_captures(tmp_path, engine):
+    slow_profiler = make_profiler(tmp_path, cooldown=60)
+    assert run(slow_profiler, engine).sampling
+    assert run(slow_profiler, engine).sampling is False
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_old_captures_are_rotated(tmp_path, engine):
+    slow_profiler = make_profiler(tmp_path, cooldown=0, max_files=2)
+    for scene in ("a", "b", "c"):
+        run(slow_profiler, engine, scene=scene)
+    assert [report["scene"] for report in read_reports(tmp_path)] == ["b", "c"]
+
+
+def test_scenes_filter(tmp_path, engine):
+    slow_profiler = make_profiler(tmp_path, scenes=frozenset({"detail"}))
+    with slow_profiler.track("users", "summary") as active:
+        assert active is None
+    run(slow_profiler, engine)
+    assert [report["scene"] for report in read_reports(tmp_path)] == ["detail"]
+
+
+def test_names_are_sanitized(tmp_path, engine):
+    run(make_profiler(tmp_path), engine, chapter="../users", scene="a/b c")
+    [name] = os.listdir(tmp_path)
+    assert name.endswith("-_users-a_b_c.json")
+    assert read_reports(tmp_path)[0]["chapter"] == "../users"
+
+
+def test_write_errors_are_logged(tmp_path, engine, caplog):
+    blocked = tmp_path / "file"
+    blocked.write_text("")
+    with caplog.at_level(logging.WARNING, logger="core.profiler"):
+        run(make_profiler(blocked), engine)
+    assert "cannot write slow request profile" in caplog.text
+
+
+@pytest.mark.parametrize("value, expected", [("users", "users"), ("a/b", "a_b"), ("..", "_"), ("", "_")])
+def test_get_file_name(value, expected):
+    assert profiler.get_file_name(value) == expected
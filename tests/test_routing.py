@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core import chapter
+from core.db import routing
+from core.db.base_class import Base
+from core.helper.db_helper import DBHelper
+from sample.models.sample import User
+from tests.conftest import make_client, user_scenario
+
+
+@pytest.fixture
+def replica():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(routing.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_reads_go_to_replicas_and_writes_pin_the_client(session_factory, replica, clock):
+    router = routing.SessionRouter(session_factory, [replica], sticky_seconds=2.0)
+    assert router.get_sessionmaker(routing.READ, "a") is replica
+    assert router.get_sessionmaker(routing.WRITE, "a") is session_factory
+
+    router.mark_write("a")
+    assert router.get_sessionmaker(routing.READ, "a") is session_factory
+    assert router.get_sessionmaker(routing.READ, "b") is replica
+    assert router.get_sessionmaker(routing.READ, None) is replica
+
+    clock[0] += 2.0
+    assert router.get_sessionmaker(routing.READ, "a") is replica
+
+
+def test_without_replicas_everything_uses_the_primary(session_factory):
+    router = routing.SessionRouter(session_factory)
+    assert router.get_sessionmaker(routing.READ, "a") is session_factory
+
+
+def test_pruning_keeps_the_client_table_bounded(session_factory, replica, clock):
+    router = routing.SessionRouter(session_factory, [replica], sticky_seconds=2.0, max_clients=2)
+    router.mark_write("a")
+    clock[0] += 3.0
+    router.mark_write("b")
+    router.mark_write("c")
+    assert not router.is_sticky("a") and router.is_sticky("b") and router.is_sticky("c")
+    assert len(router._last_write) == 2
+
+
+def test_read_after_write_sees_the_primary(session_factory, replica, clock):
+    router = routing.SessionRouter(session_factory, [replica], sticky_seconds=2.0)
+    client = make_client(chapter.APIChapter("users", DBHelper(User), [user_scenario()], router=router))
+    writer, reader = {"x-client-id": "writer"}, {"x-client-id": "reader"}
+
+    user_id = client.post("/users", json={"name": "a", "age": 1}, headers=writer).json()["id"]
+    assert client.get(f"/users/{user_id}", headers=writer).status_code == 200
+    assert client.get(f"/users/{user_id}", headers=reader).status_code == 404
+
+    clock[0] += 2.0
+    assert client.get(f"/users/{user_id}", headers=writer).status_code == 404
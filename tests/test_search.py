@@ -0,0 +1,96 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from core import chapter, search
+from core.db import stats
+from core.helper.db_helper import DBHelper
+from sample.models.sample import User
+from tests.conftest import user_scenario
+
+NAMES = ["red apple", "apple apple apple", "banana"]
+
+
+@pytest.fixture
+def existing(session_factory):
+    with session_factory() as db:
+        db.add_all([User(name=name, age=index) for index, name in enumerate(NAMES)])
+        db.add(User(name="deleted apple", age=9, is_deleted=True))
+        db.commit()
+
+
+@pytest.fixture
+def client(router, existing):
+    users = chapter.APIChapter("users", DBHelper(User), [user_scenario()], router=router,
+                               search=search.APISearch(["name"]))
+    app = FastAPI()
+    app.include_router(users.route)
+    with TestClient(app) as client:
+        yield client
+
+
+def find(client, q: str) -> list[str]:
+    response = client.get("/users", params={"q": q, "size": 100})
+    assert response.status_code == 200, response.text
+    return [row["name"] for row in response.json()["summaries"]]
+
+
+def test_startup_builds_the_index_for_existing_tables(client, session_factory):
+    with session_factory() as db:
+        rows = db.execute(text("SELECT rowid, name FROM user_search ORDER BY rowid")).all()
+    assert rows == [(1, "red apple"), (2, "apple apple apple"), (3, "banana")]
+
+
+def test_matches_are_ranked(client):
+    assert find(client, "apple") == ["apple apple apple", "red apple"]
+    assert find(client, "red apple") == ["red apple"]
+    assert find(client, "cherry") == []
+    assert len(find(client, "")) == 4
+
+
+def test_writes_keep_the_index_current(client):
+    user_id = client.post("/users", json={"name": "green apple", "age": 1}).json()["id"]
+    assert "green apple" in find(client, "green")
+
+    client.put(f"/users/{user_id}", json={"name": "green pear"})
+    assert find(client, "green") == ["green pear"]
+    assert "green pear" not in find(client, "apple")
+
+    client.delete(f"/users/{user_id}")
+    assert find(client, "green") == []
+
+
+def test_unrelated_changes_skip_reindexing(client):
+    with stats.track(capture=True) as query_stats:
+        assert client.put("/users/1", json={"age": 40}).status_code == 200
+    assert not [statement for statement, _ in query_stats.statements if "user_search" in statement]
+    with stats.track(capture=True) as query_stats:
+        assert client.put("/users/1", json={"name": "red cherry"}).status_code == 200
+    assert [statement for statement, _ in query_stats.statements if "user_search" in statement]
+
+
+def test_startup_keeps_an_existing_index(router, client):
+    listeners = len(User.__table__.dispatch.after_create)
+    users = chapter.APIChapter("users", DBHelper(User), [user_scenario()], router=router,
+                               search=search.APISearch(["name"]))
+    client.post("/users", json={"name": "plum", "age": 1})
+    assert not users.create_search_index()
+    assert find(client, "plum") == ["plum"]
+    assert len(User.__table__.dispatch.after_create) == listeners
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("apple", '"apple"'),
+    ("red  apple", '"red" "apple"'),
+    ('say "hi"', '"say" """hi"""'),
+    ("apple OR NOT pear*", '"apple" "OR" "NOT" "pear*"'),
+    ("name:apple ^x (y)", '"name:apple" "^x" "(y)"'),
+])
+def test_quote_terms(q, expected):
+    assert search.quote_terms(q) == expected
+
+
+@pytest.mark.parametrize("q", ['"', "OR", "apple NOT", "name:apple", "(", "pear*"])
+def test_operators_are_matched_literally(client, q):
+    find(client, q)
@@ -0,0 +1,64 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, String, event
+
+from core import actor, chapter, scenario, scene
+from core.db.base_class import Base, Versioned
+from core.helper.db_helper import DBHelper
+from tests.conftest import JSON_ROLE, MODEL_ROLE, make_client
+
+
+class Note(Versioned, Base):
+    title = Column(String(20))
+    body = Column(String(20))
+
+
+def note_scenario():
+    actors = {name: actor.APIActor(name, typ, JSON_ROLE, MODEL_ROLE, JSON_ROLE)
+              for name, typ in (("id", int), ("title", str), ("body", str), ("version", int))}
+    return scenario.APIScenario(actors=actors, scenes={
+        "create": scene.CreateScene(scene.Cast({"title"}, {"body"})),
+        "detail": scene.DetailScene(scene.Cast({"id", "title", "body", "version"})),
+        "update": scene.UpdateScene(scene.Cast(None, "*", {"id", "version"})),
+    })
+
+
+@pytest.fixture
+def notes(router, engine):
+    client = make_client(chapter.APIChapter("notes", DBHelper(Note), [note_scenario()], router=router))
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    client.post("/notes", json={"title": "a", "body": "b"})
+    statements.clear()
+    return client, statements
+
+
+def test_unchanged_update_writes_nothing(notes):
+    client, statements = notes
+    response = client.put("/notes/1", json={"title": "a"})
+    assert response.json()["version"] == 1
+    assert not [statement for statement in statements if statement.startswith("UPDATE")]
+
+
+def test_update_writes_only_changed_columns(notes):
+    client, statements = notes
+    response = client.put("/notes/1", json={"body": "z"})
+    assert response.json() == {"id": 1, "title": "a", "body": "z", "version": 2}
+    updates = [statement for statement in statements if statement.startswith("UPDATE")]
+    assert len(updates) == 1 and "title" not in updates[0]
+
+
+def test_if_match_guards_the_version(notes):
+    client, _ = notes
+    assert client.put("/notes/1", json={"body": "q"}, headers={"If-Match": '"2"'}).status_code == 412
+    assert client.put("/notes/1", json={"body": "q"}, headers={"If-Match": '"1"'}).status_code == 200
+
+
+def test_stale_write_is_a_conflict(notes, session_factory):
+    client, _ = notes
+    stale = session_factory()
+    stale.get(Note, 1).body = "stale"
+    assert client.put("/notes/1", json={"body": "w"}).status_code == 200
+    with pytest.raises(HTTPException) as error:
+        DBHelper(Note).commit(stale)
+    assert error.value.status_code == 409
@@ -0,0 +1,99 @@
+import pytest
+
+from core import actor, actor_role, chapter, scenario, scene, validation
+from core.helper.db_helper import DBHelper
+from sample.models.sample import User
+from tests.conftest import make_client
+
+
+def positive(value):
+    return None if value > 0 else ValueError("must be positive")
+
+
+def ascii_only(value):
+    return value if value is None else value.encode("ascii").decode()
+
+
+def user_actors() -> dict:
+    return {
+        "id": actor.APIActor("id", int, actor_role.JsonFieldRole, actor_role.ModelFieldRole),
+        "name": actor.BaseActor({
+            "request": actor_role.JsonFieldRole("name", typ=str, translator=actor_role.Transform(str.strip)),
+            "models": actor_role.ModelFieldRole("name"),
+            "response": actor_role.JsonFieldRole("name", typ=str),
+        }),
+        "age": actor.BaseActor({
+            "request": actor_role.JsonFieldRole("age", typ=str, translator=actor_role.Transform(int),
+                                                validator=positive),
+            "models": actor_role.ModelFieldRole("age"),
+            "response": actor_role.JsonFieldRole("age", typ=int),
+        }),
+        "address": actor.BaseActor({
+            "request": actor_role.JsonFieldRole("address", typ=str,
+                                                translator=actor_role.Transform(ascii_only)),
+            "models": actor_role.ModelFieldRole("address"),
+            "response": actor_role.JsonFieldRole("address", typ=str),
+        }),
+    }
+
+
+@pytest.fixture
+def client(router):
+    _scenario = scenario.APIScenario(actors=user_actors(), scenes={
+        "detail": scene.DetailScene(scene.Cast({"id", "name", "age", "address"})),
+        "create": scene.CreateScene(scene.Cast({"name", "age"}, {"address"})),
+        "update": scene.UpdateScene(scene.Cast(None, {"name", "age", "address"})),
+    })
+    return make_client(chapter.APIChapter("users", DBHelper(User), [_scenario], router=router))
+
+
+def test_missing_field(client):
+    response = client.post("/users", json={"age": "3"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == [
+        {"loc": ["body", "name"], "msg": "field required", "type": "value_error.missing"},
+    ]
+
+
+def test_wrongly_typed_field(client):
+    response = client.post("/users", json={"name": "a", "age": "3", "address": ["x"]})
+    assert response.status_code == 422
+    assert response.json()["detail"] == [
+        {"loc": ["body", "address"], "msg": "str type expected", "type": "type_error.str"},
+    ]
+
+
+def test_validator_and_translator_failures_on_create(client):
+    response = client.post("/users", json={"name": "a", "age": "0"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == [
+        {"loc": ["body", "age"], "msg": "must be positive", "type": "value_error.valueerror"},
+    ]
+    response = client.post("/users", json={"name": "a", "age": "x"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == [{
+        "loc": ["body", "age"],
+        "msg": "invalid literal for int() with base 10: 'x'",
+        "type": "value_error.valueerror",
+    }]
+
+
+def test_translator_failures_on_update(client):
+    user_id = client.post("/users", json={"name": " a ", "age": "3", "address": "x"}).json()["id"]
+    response = client.put(f"/users/{user_id}", json={"age": "-1", "address": "café"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == [
+        {"loc": ["body", "age"], "msg": "must be positive", "type": "value_error.valueerror"},
+    ]
+    response = client.put(f"/users/{user_id}", json={"address": "café"})
+    assert response.status_code == 422
+    [error] = response.json()["detail"]
+    assert error["loc"] == ["body", "address"] and error["type"] == "value_error.unicodeencodeerror"
+    assert client.get(f"/users/{user_id}").json() == {"id": user_id, "name": "a", "age": 3, "address": "x"}
+
+
+def test_child_translator_failures_carry_the_row_index():
+    actors = {"age": user_actors()["age"]}
+    with pytest.raises(validation.SceneValidationError) as error:
+        scene.CreateScene(scene.Cast({"age"})).play_many(actors, [{"age": "1"}, {"age": "x"}], ("body", "items"))
+    assert [e["loc"] for e in error.value.errors] == [["body", "items", 1, "age"]]
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, Integer, String
+
+from core import actor, chapter, scenario, scene, write_behind
+from core.db.base_class import Base
+from core.helper.db_helper import DBHelper
+from sample.models.sample import User
+from tests.conftest import JSON_ROLE, MODEL_ROLE, make_client, user_scenario
+
+
+class Reading(Base):
+    sensor = Column(String(20), nullable=False)
+    value = Column(Integer())
+
+
+def reading_scenario():
+    actors = {name: actor.APIActor(name, typ, JSON_ROLE, MODEL_ROLE, JSON_ROLE)
+              for name, typ in (("id", int), ("sensor", str), ("value", int))}
+    return scenario.APIScenario(actors=actors, scenes={
+        "create": scene.CreateScene(scene.Cast(None, {"sensor", "value"})),
+        "detail": scene.DetailScene(scene.Cast({"id", "sensor", "value"})),
+    })
+
+
+def test_create_is_queued_and_written(router, session_factory):
+    _write_behind = write_behind.WriteBehind(batch_size=10, interval=0.05)
+    client = make_client(chapter.APIChapter("users", DBHelper(User), [user_scenario()], router=router,
+                                            write_behind=_write_behind))
+    response = client.post("/users", json={"name": "a", "age": 1})
+    assert response.status_code == 202
+    assert response.json()["status"] == write_behind.QUEUED
+    _write_behind.close()
+    assert client.get(response.headers["location"]).json()["status"] == write_behind.WRITTEN
+    assert session_factory().query(User).count() == 1
+
+
+def test_closed_queue_returns_503(router):
+    _write_behind = write_behind.WriteBehind()
+    client = make_client(chapter.APIChapter("users", DBHelper(User), [user_scenario()], router=router,
+                                            write_behind=_write_behind))
+    _write_behind.close()
+    response = client.post("/users", json={"name": "a", "age": 1})
+    assert response.status_code == 503
+    assert response.headers["retry-after"]
+
+
+def test_bad_row_fails_alone(router, session_factory):
+    _write_behind = write_behind.WriteBehind(batch_size=2, interval=0.2)
+    chapter.APIChapter("readings", DBHelper(Reading), [reading_scenario()], router=router,
+                       write_behind=_write_behind)
+    good = _write_behind.submit({"sensor": "a", "value": 1})
+    bad = _write_behind.submit({"value": 2})
+    _write_behind.close()
+    assert _write_behind.status(good) == write_behind.WRITTEN
+    assert _write_behind.status(bad) == write_behind.FAILED
+    assert session_factory().query(Reading).count() == 1
+
+
+def test_rejected_submit_leaves_no_ticket(monkeypatch, session_factory):
+    _write_behind = write_behind.WriteBehind(maxsize=1).bind(DBHelper(User), session_factory)
+    monkeypatch.setattr(_write_behind, "start", lambda: None)
+    monkeypatch.setattr(write_behind.uuid, "uuid4", iter([SimpleNamespace(hex="t1"), SimpleNamespace(hex="t2")]).__next__)
+    assert _write_behind.submit({"name": "a"}) == "t1"
+    with pytest.raises(write_behind.QueueFull):
+        _write_behind.submit({"name": "b"})
+    assert _write_behind.status("t1") == write_behind.QUEUED
+    assert _write_behind.status("t2") is None